@@ -1,39 +1,54 @@
 """
 Analysis package - zawiera wszystkie funkcje do analizy danych symulacji
+
+Podmoduły są importowane leniwie (PEP 562) przy pierwszym odwołaniu do funkcji,
+dzięki czemu samo `import analysis` nie ładuje pandas ani matplotlib.
 """
 
-from .data_loader import (
-    load_raw_simulation_data,
-    calculate_statistics_from_raw_data,
-    calculate_jam_length_from_data,
-    calculate_bus_efficiency_from_data
-)
-from .lane_analysis import (
-    analyze_lane_capacity,
-    print_lane_capacity_analysis,
-    analyze_all_lane_capacities,
-    print_all_lane_capacities_summary
-)
-from .comparison_analysis import (
-    compare_bus_lane_efficiency,
-    run_comparison_study,
-    test_custom_configuration,
-    test_direct_parameter_approach
-)
-from .visualization import create_visualization
-
-__all__ = [
-    'load_raw_simulation_data',
-    'calculate_statistics_from_raw_data',
-    'calculate_jam_length_from_data',
-    'calculate_bus_efficiency_from_data',
-    'analyze_lane_capacity',
-    'print_lane_capacity_analysis',
-    'analyze_all_lane_capacities',
-    'print_all_lane_capacities_summary',
-    'compare_bus_lane_efficiency',
-    'run_comparison_study',
-    'test_custom_configuration',
-    'test_direct_parameter_approach',
-    'create_visualization'
-]
\ No newline at end of file
+import importlib
+
+_SUBMODULES = {
+    'index_simulation_files': 'data_loader',
+    'find_simulation_files': 'data_loader',
+    'available_patterns': 'data_loader',
+    'load_raw_simulation_data': 'data_loader',
+    'load_many_simulation_data': 'data_loader',
+    'load_simulation_stats_from_files': 'data_loader',
+    'clear_simulation_cache': 'data_loader',
+    'read_simulation_config': 'data_loader',
+    'read_vehicle_log': 'data_loader',
+    'read_vehicle_log_summary': 'data_loader',
+    'split_vehicle_log': 'data_loader',
+    'calculate_statistics_from_raw_data': 'data_loader',
+    'calculate_statistics_from_log_summary': 'data_loader',
+    'latest_vehicle_records': 'data_loader',
+    'calculate_vehicle_speeds': 'data_loader',
+    'calculate_jam_length_from_data': 'data_loader',
+    'calculate_bus_efficiency_from_data': 'data_loader',
+    'analyze_lane_capacity': 'lane_analysis',
+    'print_lane_capacity_analysis': 'lane_analysis',
+    'analyze_all_lane_capacities': 'lane_analysis',
+    'print_all_lane_capacities_summary': 'lane_analysis',
+    'compare_bus_lane_efficiency': 'comparison_analysis',
+    'run_comparison_study': 'comparison_analysis',
+    'test_custom_configuration': 'comparison_analysis',
+    'test_direct_parameter_approach': 'comparison_analysis',
+    'create_visualization': 'visualization'
+}
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name):
+    """Importuje podmoduł przy pierwszym odwołaniu do eksportowanej funkcji"""
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
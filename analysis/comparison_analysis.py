@@ -3,16 +3,24 @@ Comparison analysis functions for different traffic scenarios
 """
 
 import os
-import pandas as pd
+import csv
 import time
-import glob
-from typing import Dict, Any
-from datetime import datetime
+import heapq
+import importlib.util
+import numpy as np
+from typing import Dict, Any, Iterable, List, Optional
+from operator import itemgetter
 
-from .data_loader import load_raw_simulation_data
+from .output_utils import buffered_output
+from .data_loader import (
+    load_raw_simulation_data,
+    load_many_simulation_data,
+    index_simulation_files,
+    available_patterns
+)
 
 
-def compare_bus_lane_efficiency(save_csv: bool = True) -> Dict[str, Any]:
+def compare_bus_lane_efficiency(save_csv: bool = True, file_format: str = 'csv') -> Dict[str, Any]:
     """Porównuje efektywność buspasa - analizuje surowe dane z CSV"""
     print("="*60)
     print("ANALIZA PORÓWNAWCZA EFEKTYWNOŚCI BUSPASA")
@@ -20,7 +28,8 @@ def compare_bus_lane_efficiency(save_csv: bool = True) -> Dict[str, Any]:
     print("="*60)
     
     data_dir = "simulation_data"
-    if not os.path.exists(data_dir):
+    file_index = index_simulation_files(data_dir)
+    if file_index is None:
         print(f"Brak katalogu {data_dir}. Najpierw uruchom symulacje.")
         return {'results': {}, 'efficiency_metrics': {}, 'comparison_table': None}
     
@@ -32,24 +41,33 @@ def compare_bus_lane_efficiency(save_csv: bool = True) -> Dict[str, Any]:
     
     results_data = {}
     
-    for scenario, patterns in scenario_patterns.items():
+    scenario_available = {
+        scenario: available_patterns(file_index, patterns)
+        for scenario, patterns in scenario_patterns.items()
+    }
+    # Pierwszy pasujący wzorzec każdego scenariusza ładowany jest równolegle; kolejne tylko gdy zawiedzie
+    preloaded = load_many_simulation_data(
+        data_dir, [patterns[0] for patterns in scenario_available.values() if patterns], index=file_index
+    )
+    
+    for scenario, patterns in scenario_available.items():
         print(f"\nAnalizowanie scenariusza {scenario}...")
         
-        found = False
         for pattern in patterns:
-            stats = load_raw_simulation_data(data_dir, pattern)
+            if pattern in preloaded:
+                stats = preloaded[pattern]
+            else:
+                stats = load_raw_simulation_data(data_dir, pattern, index=file_index)
             if stats:
                 results_data[scenario] = stats
                 print(f"   Załadowano z: {stats['source_file']}")
-                found = True
                 break
-        
-        if not found:
+        else:
             print(f"   UWAGA: Nie znaleziono danych dla scenariusza {scenario}")
+            print("Brak wystarczających danych do analizy. Potrzebne są dane dla scenariuszy A, B, C.")
+            return {'results': {}, 'efficiency_metrics': {}, 'comparison_table': None}
     
-    if len(results_data) < 3:
-        print("Brak wystarczających danych do analizy. Potrzebne są dane dla scenariuszy A, B, C.")
-        return {'results': {}, 'efficiency_metrics': {}, 'comparison_table': None}
+    normalize_results(results_data)
     
     results_a = results_data.get('A', {})
     results_b = results_data.get('B', {})  
@@ -57,11 +75,14 @@ def compare_bus_lane_efficiency(save_csv: bool = True) -> Dict[str, Any]:
     
     efficiency_metrics = analyze_efficiency_metrics(results_a, results_b, results_c)
     
-    display_efficiency_results(results_a, results_b, results_c, efficiency_metrics)
+    comparison_rows = build_comparison_rows(results_a, results_b, results_c)
+    display_efficiency_results(results_a, results_b, results_c, efficiency_metrics, comparison_rows)
     
     comparison_table = None
     if save_csv:
-        comparison_table = save_efficiency_results(results_a, results_b, results_c, efficiency_metrics)
+        comparison_table = save_efficiency_results(results_a, results_b, results_c, efficiency_metrics,
+                                                   comparison_rows=comparison_rows, data_dir=data_dir,
+                                                   file_format=file_format)
     
     return {
         'results': {'A': results_a, 'B': results_b, 'C': results_c},
@@ -70,6 +91,13 @@ def compare_bus_lane_efficiency(save_csv: bool = True) -> Dict[str, Any]:
     }
 
 
+def normalize_results(results: Dict[str, Dict[str, Any]]) -> None:
+    """Ujednolica słowniki wyników: bus_efficiency zawsze jako float i flaga has_bus_efficiency"""
+    for data in results.values():
+        data['bus_efficiency'] = float(data.get('bus_efficiency') or 0.0)
+        data['has_bus_efficiency'] = data['bus_efficiency'] > 0
+
+
 def run_comparison_study(simulation_module) -> Dict[str, Any]:
     """Uruchamia porównawczą analizę wszystkich wariantów - analizuje surowe dane z CSV"""
     print("="*60)
@@ -79,12 +107,13 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
     print("="*60)
     
     data_dir = "simulation_data"
-    if not os.path.exists(data_dir):
+    file_index = index_simulation_files(data_dir)
+    if file_index is None:
         print(f"Brak katalogu {data_dir}. Najpierw uruchom symulacje.")
         return {}
     
-    all_vehicle_files = glob.glob(os.path.join(data_dir, "*_vehicles.csv"))
-    if not all_vehicle_files:
+    vehicle_stems = file_index['_vehicles.csv']
+    if not vehicle_stems:
         print("Brak plików z danymi pojazdów.")
         return {}
     
@@ -95,18 +124,17 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
         'D': ['variant_d']
     }
     
-    custom_patterns = []
-    for file_path in all_vehicle_files:
-        filename = os.path.basename(file_path)
-        if 'custom_' in filename:
-            pattern = filename.replace('_vehicles.csv', '')
-            custom_patterns.append(pattern)
+    custom_patterns = sorted(stem for stem in vehicle_stems if 'custom_' in stem)
     
     results = {}
     params = simulation_module.SimulationParameters()
     
-    if any(any(glob.glob(os.path.join(data_dir, f"*{pattern}*_vehicles.csv")) for pattern in patterns) 
-           for patterns in standard_patterns.values()):
+    standard_available = {
+        variant: available_patterns(file_index, patterns)
+        for variant, patterns in standard_patterns.items()
+    }
+    
+    if any(standard_available.values()):
         print("\nSTANDARDOWE WARIANTY:")
         print("-" * 60)
         for variant in ['A', 'B', 'C', 'D']:
@@ -114,10 +142,15 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
             print(f"Wariant {variant}: {config_desc}")
         print("-" * 60)
     
-    for variant, patterns in standard_patterns.items():
+    patterns_to_load = [pattern for patterns in standard_available.values() for pattern in patterns]
+    loaded = load_many_simulation_data(data_dir, patterns_to_load + custom_patterns, index=file_index)
+    # Konfiguracje są sparsowane już przy liczeniu statystyk - opisy scenariuszy korzystają z nich bez ponownego odczytu
+    configs = {pattern: stats.pop('config', None) for pattern, stats in loaded.items()}
+    
+    for variant, patterns in standard_available.items():
         found = False
         for pattern in patterns:
-            stats = load_raw_simulation_data(data_dir, pattern)
+            stats = loaded[pattern]
             if stats:
                 results[variant] = stats
                 print(f"\nWariant {variant}: {stats['source_file']}")
@@ -132,17 +165,16 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
         print("-" * 60)
         
         for i, pattern in enumerate(custom_patterns):
-            stats = load_raw_simulation_data(data_dir, pattern)
+            stats = loaded[pattern]
             if stats:
-                config_file = os.path.join(data_dir, f"{pattern}_config.csv")
-                if os.path.exists(config_file):
-                    config_df = pd.read_csv(config_file)
-                    config = config_df.iloc[0]
-                    
+                config = configs[pattern]
+                if config is not None:
                     num_lanes = config.get('num_lanes') or config.get('lane_count', 'N/A')
                     has_bus = config.get('has_bus_lane', False)
-                    traffic_int = config.get('traffic_intensity') or (config.get('traffic_intensity_max', 0) / 1000.0)
-                    priv_pct = config.get('privileged_percentage', 'N/A')
+                    traffic_int = config.get('traffic_intensity') or ((config.get('traffic_intensity_max') or 0) / 1000.0)
+                    priv_pct = config.get('privileged_percentage')
+                    if priv_pct is None:
+                        priv_pct = 'N/A'
                     
                     custom_desc = f"{num_lanes} pasów"
                     if has_bus:
@@ -152,7 +184,7 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
                         custom_desc += f", int={float(traffic_int):.1f}"
                     
                     if priv_pct != 'N/A':
-                        custom_desc += f", bus={int(priv_pct)}%"
+                        custom_desc += f", bus={int(float(priv_pct))}%"
                 else:
                     custom_desc = "Niestandardowy scenariusz"
                 
@@ -165,8 +197,10 @@ def run_comparison_study(simulation_module) -> Dict[str, Any]:
         print("Brak danych do analizy.")
         return {}
     
+    normalize_results(results)
+    
     total_scenarios = len(results)
-    standard_count = sum(1 for k in results.keys() if k in ['A', 'B', 'C', 'D'])
+    standard_count = sum(1 for k in results.keys() if k in STANDARD_VARIANTS)
     custom_count = total_scenarios - standard_count
     
     print(f"\nPrzeanalizowano {total_scenarios} scenariuszy:")
@@ -252,84 +286,105 @@ def test_custom_configuration(
         return {}
 
 
-def test_direct_parameter_approach(simulation_module) -> Dict[str, Any]:
-    """Demonstracja bezpośredniego wywołania metody z parametrami"""
+def test_direct_parameter_approach(simulation_module, skip_minimal: bool = False,
+                                   skip_maximal: bool = False) -> Dict[str, Any]:
+    """Demonstracja bezpośredniego wywołania metody z parametrami
+    
+    Args:
+        simulation_module: moduł symulacji
+        skip_minimal: pomija konfigurację minimalistyczną
+        skip_maximal: pomija konfigurację maksymalną
+    
+    Returns:
+        Dict z wynikami uruchomionych konfiguracji ('minimal' / 'maximal')
+    """
     print("="*60)
     print("TEST BEZPOŚREDNIEGO PODEJŚCIA Z PARAMETRAMI")
     print("="*60)
     
+    if skip_minimal and skip_maximal:
+        print("Pominięto obie konfiguracje.")
+        return {}
+    
     params = simulation_module.SimulationParameters()
     
     print("Testowanie różnych konfiguracji poprzez bezpośrednie parametry...")
     
-    print("\n--- Konfiguracja minimalistyczna ---")
-    minimal_params = {
-        'num_lanes': 1,
-        'has_bus_lane': False,
-        'bus_lane_capacity': 0,
-        'traffic_light_positions': [2.5],
-        'green_ratio': 0.5
-    }
-    
-    sim1 = simulation_module.create_simulation_with_parameters(params, minimal_params)
-    sim1_raw = sim1.run_simulation()
-    sim1._calculate_final_statistics()
-    results1 = sim1.statistics
-    print(f"Wynik: {results1['avg_travel_time']:.1f}s średni czas, {results1['avg_speed']:.1f} km/h")
-    
-    print("\n--- Konfiguracja maksymalna ---")
-    maximal_params = {
-        'num_lanes': 6,
-        'has_bus_lane': True,
-        'bus_lane_capacity': params.lane_capacity * 2,
-        'traffic_light_positions': [1.0, 2.0, 3.0, 4.0],
-        'green_ratio': 0.9
-    }
-    
-    sim2 = simulation_module.create_simulation_with_parameters(params, maximal_params)
-    sim2_raw = sim2.run_simulation()
-    sim2._calculate_final_statistics()
-    results2 = sim2.statistics
-    print(f"Wynik: {results2['avg_travel_time']:.1f}s średni czas, {results2['avg_speed']:.1f} km/h")
+    results = {}
     
-    print(f"\nPorównanie:")
-    print(f"Konfiguracja minimalistyczna: {results1['avg_travel_time']:.1f}s")
-    print(f"Konfiguracja maksymalna: {results2['avg_travel_time']:.1f}s")
-    improvement = ((results1['avg_travel_time'] - results2['avg_travel_time']) / results1['avg_travel_time'] * 100)
-    print(f"Poprawa: {improvement:+.1f}%")
+    if not skip_minimal:
+        print("\n--- Konfiguracja minimalistyczna ---")
+        minimal_params = {
+            'num_lanes': 1,
+            'has_bus_lane': False,
+            'bus_lane_capacity': 0,
+            'traffic_light_positions': [2.5],
+            'green_ratio': 0.5
+        }
+        
+        sim1 = simulation_module.create_simulation_with_parameters(params, minimal_params)
+        sim1.run_simulation()
+        sim1._calculate_final_statistics()
+        results['minimal'] = sim1.statistics
+        print(f"Wynik: {results['minimal']['avg_travel_time']:.1f}s średni czas, {results['minimal']['avg_speed']:.1f} km/h")
+    
+    if not skip_maximal:
+        print("\n--- Konfiguracja maksymalna ---")
+        maximal_params = {
+            'num_lanes': 6,
+            'has_bus_lane': True,
+            'bus_lane_capacity': params.lane_capacity * 2,
+            'traffic_light_positions': [1.0, 2.0, 3.0, 4.0],
+            'green_ratio': 0.9
+        }
+        
+        sim2 = simulation_module.create_simulation_with_parameters(params, maximal_params)
+        sim2.run_simulation()
+        sim2._calculate_final_statistics()
+        results['maximal'] = sim2.statistics
+        print(f"Wynik: {results['maximal']['avg_travel_time']:.1f}s średni czas, {results['maximal']['avg_speed']:.1f} km/h")
+    
+    if 'minimal' in results and 'maximal' in results:
+        results1 = results['minimal']
+        results2 = results['maximal']
+        print(f"\nPorównanie:")
+        print(f"Konfiguracja minimalistyczna: {results1['avg_travel_time']:.1f}s")
+        print(f"Konfiguracja maksymalna: {results2['avg_travel_time']:.1f}s")
+        improvement = ((results1['avg_travel_time'] - results2['avg_travel_time']) / results1['avg_travel_time'] * 100)
+        print(f"Poprawa: {improvement:+.1f}%")
     
-    return {'minimal': results1, 'maximal': results2}
+    return results
 
 
 def analyze_efficiency_metrics(results_a: Dict, results_b: Dict, results_c: Dict) -> Dict[str, float]:
     """Analizuje metryki efektywności między scenariuszami"""
-    efficiency_metrics = {}
-    
-    time_improvement_a_b = ((results_a['avg_travel_time'] - results_b['avg_travel_time']) / results_a['avg_travel_time'] * 100)
-    efficiency_metrics['time_improvement_a_b'] = time_improvement_a_b
-    
-    speed_improvement_a_b = ((results_b['avg_speed'] - results_a['avg_speed']) / results_a['avg_speed'] * 100)
-    efficiency_metrics['speed_improvement_a_b'] = speed_improvement_a_b
+    metric_keys = ('avg_travel_time', 'avg_speed', 'traffic_jam_length')
+    values = np.array([[res[key] for key in metric_keys] for res in (results_a, results_b, results_c)], dtype=float)
     
-    jam_improvement_a_b = ((results_a['traffic_jam_length'] - results_b['traffic_jam_length']) / max(results_a['traffic_jam_length'], 0.001) * 100)
-    efficiency_metrics['jam_improvement_a_b'] = jam_improvement_a_b
+    # Wiersz odniesienia (A lub C); długość korka ograniczona od dołu, by uniknąć dzielenia przez zero
+    references = values[[0, 2]]
+    denominators = references.copy()
+    denominators[:, 2] = np.maximum(denominators[:, 2], 0.001)
     
-    time_improvement_c_b = ((results_c['avg_travel_time'] - results_b['avg_travel_time']) / results_c['avg_travel_time'] * 100)
-    efficiency_metrics['time_improvement_c_b'] = time_improvement_c_b
+    # Poprawa względem B w %: dla prędkości wzrost jest poprawą, więc znak jest odwrócony
+    improvements = (references - values[1]) / denominators * 100
+    improvements[:, 1] = -improvements[:, 1]
     
-    speed_improvement_c_b = ((results_b['avg_speed'] - results_c['avg_speed']) / results_c['avg_speed'] * 100)
-    efficiency_metrics['speed_improvement_c_b'] = speed_improvement_c_b
-    
-    jam_improvement_c_b = ((results_c['traffic_jam_length'] - results_b['traffic_jam_length']) / max(results_c['traffic_jam_length'], 0.001) * 100)
-    efficiency_metrics['jam_improvement_c_b'] = jam_improvement_c_b
+    efficiency_metrics = {}
+    for row, suffix in enumerate(('a_b', 'c_b')):
+        efficiency_metrics[f'time_improvement_{suffix}'] = float(improvements[row, 0])
+        efficiency_metrics[f'speed_improvement_{suffix}'] = float(improvements[row, 1])
+        efficiency_metrics[f'jam_improvement_{suffix}'] = float(improvements[row, 2])
     
-    if results_b['bus_efficiency'] > 0:
+    if results_b.get('has_bus_efficiency', results_b['bus_efficiency'] > 0):
         efficiency_metrics['bus_efficiency'] = results_b['bus_efficiency']
     
     return efficiency_metrics
 
 
-def display_efficiency_results(results_a: Dict, results_b: Dict, results_c: Dict, efficiency_metrics: Dict):
+@buffered_output()
+def display_efficiency_results(results_a: Dict, results_b: Dict, results_c: Dict, efficiency_metrics: Dict,
+                               comparison_rows: Optional[List[Dict[str, Any]]] = None):
     """Wyświetla wyniki analizy efektywności"""
     print("\n" + "="*60)
     print("ANALIZA EFEKTYWNOŚCI BUSPASA")
@@ -358,57 +413,9 @@ def display_efficiency_results(results_a: Dict, results_b: Dict, results_c: Dict
     print("TABELA PORÓWNAWCZA")
     print("="*60)
     
-    comparison_data = {
-        'Scenariusz': ['A: 3 pasy', 'B: 2 pasy+bus', 'C: 3 pasy+bus'],
-        'Ukończone': [
-            results_a['total_vehicles'],
-            results_b['total_vehicles'],
-            results_c['total_vehicles']
-        ],
-        'Wjechało': [
-            results_a['total_entered'],
-            results_b['total_entered'],
-            results_c['total_entered']
-        ],
-        'W kolejce': [
-            results_a['vehicles_in_queue'],
-            results_b['vehicles_in_queue'],
-            results_c['vehicles_in_queue']
-        ],
-        'W ruchu': [
-            results_a['vehicles_in_traffic'],
-            results_b['vehicles_in_traffic'],
-            results_c['vehicles_in_traffic']
-        ],
-        'Sukces%': [
-            f"{results_a['completion_rate']:.1f}",
-            f"{results_b['completion_rate']:.1f}",
-            f"{results_c['completion_rate']:.1f}"
-        ],
-        'Czas[s]': [
-            f"{results_a['avg_travel_time']:.1f}",
-            f"{results_b['avg_travel_time']:.1f}",
-            f"{results_c['avg_travel_time']:.1f}"
-        ],
-        'Prędkość[km/h]': [
-            f"{results_a['avg_speed']:.1f}",
-            f"{results_b['avg_speed']:.1f}",
-            f"{results_c['avg_speed']:.1f}"
-        ],
-        'Korek[km]': [
-            f"{results_a['traffic_jam_length']:.2f}",
-            f"{results_b['traffic_jam_length']:.2f}",
-            f"{results_c['traffic_jam_length']:.2f}"
-        ],
-        'Bus%': [
-            'N/A',
-            f"{results_b['bus_efficiency']:.1f}" if results_b['bus_efficiency'] > 0 else 'N/A',
-            f"{results_c['bus_efficiency']:.1f}" if results_c['bus_efficiency'] > 0 else 'N/A'
-        ]
-    }
-    
-    df = pd.DataFrame(comparison_data)
-    print(df.to_string(index=False))
+    if comparison_rows is None:
+        comparison_rows = build_comparison_rows(results_a, results_b, results_c)
+    print(format_comparison_table(comparison_rows))
     
     display_conclusions(efficiency_metrics)
 
@@ -437,73 +444,142 @@ def display_conclusions(efficiency_metrics: Dict):
         print("Buspas nie redukuje korków")
 
 
-def save_efficiency_results(results_a: Dict, results_b: Dict, results_c: Dict, efficiency_metrics: Dict) -> pd.DataFrame:
-    """Zapisuje wyniki efektywności do plików CSV"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+COMPARISON_COLUMN_FORMATS = {
+    'Sukces%': '{:.1f}',
+    'Czas[s]': '{:.1f}',
+    'Prędkość[km/h]': '{:.1f}',
+    'Korek[km]': '{:.2f}',
+    'Bus%': '{:.1f}'
+}
+
+
+def build_comparison_rows(results_a: Dict, results_b: Dict, results_c: Dict) -> List[Dict[str, Any]]:
+    """Buduje wiersze tabeli porównawczej scenariuszy A, B, C (wartości liczbowe, Bus% = None gdy brak)"""
+    labels = ['A: 3 pasy', 'B: 2 pasy+bus', 'C: 3 pasy+bus']
+    rows = []
+    for label, res in zip(labels, (results_a, results_b, results_c)):
+        if res is results_a or not res.get('has_bus_efficiency', res['bus_efficiency'] > 0):
+            bus_eff = None
+        else:
+            bus_eff = res['bus_efficiency']
+        rows.append({
+            'Scenariusz': label,
+            'Ukończone': res['total_vehicles'],
+            'Wjechało': res['total_entered'],
+            'W kolejce': res['vehicles_in_queue'],
+            'W ruchu': res['vehicles_in_traffic'],
+            'Sukces%': res['completion_rate'],
+            'Czas[s]': res['avg_travel_time'],
+            'Prędkość[km/h]': res['avg_speed'],
+            'Korek[km]': res['traffic_jam_length'],
+            'Bus%': bus_eff
+        })
+    return rows
+
+
+def format_comparison_row(row: Dict[str, Any]) -> Dict[str, str]:
+    """Formatuje wiersz tabeli porównawczej do wyświetlenia lub zapisu"""
+    return {
+        column: 'N/A' if value is None else COMPARISON_COLUMN_FORMATS.get(column, '{}').format(value)
+        for column, value in row.items()
+    }
+
+
+def format_table(headers: List[str], rows: List[List[str]], numeric_columns: Iterable[str] = ()) -> str:
+    """Formatuje tabelę tekstową tak samo jak DataFrame.to_string(index=False)
     
-    efficiency_df = pd.DataFrame([efficiency_metrics])
-    efficiency_df['timestamp'] = timestamp
-    efficiency_file = f"simulation_data/bus_efficiency_comparison_{timestamp}.csv"
-    efficiency_df.to_csv(efficiency_file, index=False)
-    print(f"\nZapisano analizę efektywności do: {efficiency_file}")
+    Kolumny są wyrównane do prawej; kolumny liczbowe (numeric_columns) mają, jak w pandas,
+    dodatkowe miejsce przed nagłówkiem.
+    """
+    numeric_columns = set(numeric_columns)
+    widths = [max(len(h) + (h in numeric_columns), *(len(r[i]) for r in rows)) for i, h in enumerate(headers)]
+    lines = [" ".join(h.rjust(w) for h, w in zip(headers, widths))]
+    lines.extend(" ".join(cell.rjust(w) for cell, w in zip(r, widths)) for r in rows)
+    return "\n".join(lines)
+
+
+def format_comparison_table(comparison_rows: List[Dict[str, Any]]) -> str:
+    """Formatuje wiersze z build_comparison_rows jako tabelę tekstową (kolumny całkowite jako liczbowe)"""
+    formatted_rows = [format_comparison_row(row) for row in comparison_rows]
+    headers = list(formatted_rows[0].keys())
+    numeric_columns = [h for h in headers if isinstance(comparison_rows[0][h], (int, np.integer))]
+    return format_table(headers, [list(row.values()) for row in formatted_rows], numeric_columns)
+
+
+def write_result_table(base_path: str, rows: List[Dict[str, Any]], file_format: str = 'csv',
+                       csv_rows: Optional[List[Dict[str, str]]] = None) -> str:
+    """Zapisuje tabelę wyników jako CSV lub Parquet
+    
+    Args:
+        base_path: ścieżka pliku bez rozszerzenia
+        rows: wiersze z wartościami liczbowymi (dla Parquet)
+        file_format: 'csv' lub 'parquet'
+        csv_rows: wiersze sformatowane tekstowo do CSV (None = rows)
+    
+    Returns:
+        Ścieżka zapisanego pliku
+    """
+    if file_format == 'parquet':
+        import pandas as pd
+        path = f"{base_path}.parquet"
+        pd.DataFrame(rows).to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+        return path
+    
+    path = f"{base_path}.csv"
+    with open(path, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()), lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(csv_rows if csv_rows is not None else rows)
+    return path
+
+
+def save_efficiency_results(results_a: Dict, results_b: Dict, results_c: Dict, efficiency_metrics: Dict,
+                            return_df: bool = False,
+                            comparison_rows: Optional[List[Dict[str, Any]]] = None,
+                            data_dir: str = "simulation_data",
+                            file_format: str = 'csv'):
+    """Zapisuje wyniki efektywności do plików CSV (lub Parquet)
+    
+    Args:
+        comparison_rows: wiersze z build_comparison_rows (None = zbuduj na nowo)
+        data_dir: katalog docelowy plików
+        file_format: 'csv' albo 'parquet' (wymaga pyarrow, bez niego zapis CSV)
+    
+    Returns:
+        Wiersze tabeli porównawczej (lista słowników) lub pd.DataFrame, gdy return_df=True
+    """
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Nieobsługiwany format pliku: {file_format}")
     
-    comparison_data = {
-        'Scenariusz': ['A: 3 pasy', 'B: 2 pasy+bus', 'C: 3 pasy+bus'],
-        'Ukończone': [
-            results_a['total_vehicles'],
-            results_b['total_vehicles'],
-            results_c['total_vehicles']
-        ],
-        'Wjechało': [
-            results_a['total_entered'],
-            results_b['total_entered'],
-            results_c['total_entered']
-        ],
-        'W kolejce': [
-            results_a['vehicles_in_queue'],
-            results_b['vehicles_in_queue'],
-            results_c['vehicles_in_queue']
-        ],
-        'W ruchu': [
-            results_a['vehicles_in_traffic'],
-            results_b['vehicles_in_traffic'],
-            results_c['vehicles_in_traffic']
-        ],
-        'Sukces%': [
-            f"{results_a['completion_rate']:.1f}",
-            f"{results_b['completion_rate']:.1f}",
-            f"{results_c['completion_rate']:.1f}"
-        ],
-        'Czas[s]': [
-            f"{results_a['avg_travel_time']:.1f}",
-            f"{results_b['avg_travel_time']:.1f}",
-            f"{results_c['avg_travel_time']:.1f}"
-        ],
-        'Prędkość[km/h]': [
-            f"{results_a['avg_speed']:.1f}",
-            f"{results_b['avg_speed']:.1f}",
-            f"{results_c['avg_speed']:.1f}"
-        ],
-        'Korek[km]': [
-            f"{results_a['traffic_jam_length']:.2f}",
-            f"{results_b['traffic_jam_length']:.2f}",
-            f"{results_c['traffic_jam_length']:.2f}"
-        ],
-        'Bus%': [
-            'N/A',
-            f"{results_b['bus_efficiency']:.1f}" if results_b['bus_efficiency'] > 0 else 'N/A',
-            f"{results_c['bus_efficiency']:.1f}" if results_c['bus_efficiency'] > 0 else 'N/A'
-        ]
-    }
+    if file_format == 'parquet':
+        if importlib.util.find_spec('pyarrow') is None:
+            print("pyarrow nie jest dostępny - zapisuję wyniki w formacie CSV")
+            file_format = 'csv'
+    
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     
-    df = pd.DataFrame(comparison_data)
-    comparison_file = f"simulation_data/scenario_comparison_{timestamp}.csv"
-    df.to_csv(comparison_file, index=False)
+    efficiency_row = dict(efficiency_metrics, timestamp=timestamp)
+    efficiency_file = write_result_table(
+        os.path.join(data_dir, f"bus_efficiency_comparison_{timestamp}"), [efficiency_row], file_format
+    )
+    print(f"\nZapisano analizę efektywności do: {efficiency_file}")
+    
+    if comparison_rows is None:
+        comparison_rows = build_comparison_rows(results_a, results_b, results_c)
+    comparison_file = write_result_table(
+        os.path.join(data_dir, f"scenario_comparison_{timestamp}"), comparison_rows, file_format,
+        csv_rows=[format_comparison_row(row) for row in comparison_rows]
+    )
     print(f"Zapisano tabelę porównawczą do: {comparison_file}")
     
-    return df
+    if return_df:
+        import pandas as pd
+        return pd.DataFrame(comparison_rows)
+    
+    return comparison_rows
 
 
+@buffered_output()
 def display_comparison_results(results: Dict[str, Any], params, simulation_module):
     """Wyświetla analizę porównawczą wyników"""
     print("\n" + "="*60)
@@ -516,21 +592,18 @@ def display_comparison_results(results: Dict[str, Any], params, simulation_modul
     print("-" * 102)
     
     for variant in available_variants:
-        variant_display = variant[:11] if len(variant) > 11 else variant
-        
-        bus_eff = f"{results[variant]['bus_efficiency']:.1f}" if results[variant]['bus_efficiency'] > 0 else "N/A"
-        
-        in_queue = results[variant].get('vehicles_in_queue', 0)
-        in_traffic = results[variant].get('vehicles_in_traffic', 0)
+        data = results[variant]
+        variant_display = variant[:11]
+        bus_eff = f"{data['bus_efficiency']:.1f}" if data['has_bus_efficiency'] else "N/A"
         
         print(f"{variant_display:<12} "
-              f"{results[variant]['total_vehicles']:<7} "
-              f"{results[variant].get('total_entered', results[variant]['total_vehicles']):<8} "
-              f"{in_queue:<9} "
-              f"{in_traffic:<8} "
-              f"{results[variant].get('completion_rate', 100.0):<8.1f} "
-              f"{results[variant]['avg_travel_time']:<8.1f} "
-              f"{results[variant]['traffic_jam_length']:<9.2f} "
+              f"{data['total_vehicles']:<7} "
+              f"{data.get('total_entered', data['total_vehicles']):<8} "
+              f"{data.get('vehicles_in_queue', 0):<9} "
+              f"{data.get('vehicles_in_traffic', 0):<8} "
+              f"{data.get('completion_rate', 100.0):<8.1f} "
+              f"{data['avg_travel_time']:<8.1f} "
+              f"{data['traffic_jam_length']:<9.2f} "
               f"{bus_eff:<6}")
     
     print(f"\n{'='*60}")
@@ -549,10 +622,7 @@ def display_comparison_results(results: Dict[str, Any], params, simulation_modul
     
     for variant in available_variants:
         if variant.startswith('CUSTOM_'):
-            if 'description' in results[variant]:
-                desc = results[variant]["description"]
-            else:
-                desc = "Niestandardowy scenariusz"
+            desc = results[variant].get('description', "Niestandardowy scenariusz")
         else:
             try:
                 desc = simulation_module.get_variant_short_description(variant, params)
@@ -561,35 +631,76 @@ def display_comparison_results(results: Dict[str, Any], params, simulation_modul
         
         print(f"{variant}: {desc}")
     
-    display_rankings(results)
+    rankings = compute_rankings(results)
+    display_rankings(results, rankings)
     display_hypotheses_verification(results)
-    display_recommendations(results)
+    display_recommendations(results, rankings)
+
+
+def compute_rankings(results: Dict[str, Any], limit: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Sortuje warianty raz dla każdego kryterium
+    
+    Args:
+        results: wyniki wariantów
+        limit: ile najlepszych wariantów zwrócić (None = pełny ranking)
+    
+    Returns:
+        Słownik kryterium -> lista wariantów od najlepszego do najgorszego
+    """
+    rows = [
+        (variant,
+         data['avg_travel_time'],
+         data['avg_speed'],
+         data['traffic_jam_length'],
+         data.get('completion_rate', 100.0),
+         data.get('total_entered', data['total_vehicles']))
+        for variant, data in results.items()
+    ]
+    
+    def ranked(column: int, reverse: bool = False) -> List[str]:
+        key = itemgetter(column)
+        if limit is None:
+            ordered = sorted(rows, key=key, reverse=reverse)
+        elif limit == 1:
+            ordered = [max(rows, key=key) if reverse else min(rows, key=key)] if rows else []
+        else:
+            ordered = heapq.nlargest(limit, rows, key=key) if reverse else heapq.nsmallest(limit, rows, key=key)
+        return [row[0] for row in ordered]
+    
+    return {
+        'travel_time': ranked(1),
+        'speed': ranked(2, reverse=True),
+        'jam': ranked(3),
+        'completion': ranked(4, reverse=True),
+        'throughput': ranked(5, reverse=True)
+    }
 
 
-def display_rankings(results: Dict[str, Any]):
+def display_rankings(results: Dict[str, Any], rankings: Optional[Dict[str, List[str]]] = None):
     """Wyświetla rankingi wariantów"""
+    if rankings is None:
+        rankings = compute_rankings(results)
+    
     print("\n" + "="*60)
     print("RANKING WARIANTÓW")
     print("="*60)
     
-    travel_time_ranking = sorted(results.items(), key=lambda x: x[1]['avg_travel_time'])
     print("\nRanking po czasie przejazdu (najlepszy → najgorszy):")
-    for i, (variant, data) in enumerate(travel_time_ranking, 1):
-        print(f"   {i}. Wariant {variant}: {data['avg_travel_time']:.1f}s")
+    for i, variant in enumerate(rankings['travel_time'], 1):
+        print(f"   {i}. Wariant {variant}: {results[variant]['avg_travel_time']:.1f}s")
     
-    speed_ranking = sorted(results.items(), key=lambda x: x[1]['avg_speed'], reverse=True)
     print("\nRanking po średniej prędkości (najlepszy → najgorszy):")
-    for i, (variant, data) in enumerate(speed_ranking, 1):
-        print(f"   {i}. Wariant {variant}: {data['avg_speed']:.1f} km/h")
+    for i, variant in enumerate(rankings['speed'], 1):
+        print(f"   {i}. Wariant {variant}: {results[variant]['avg_speed']:.1f} km/h")
     
-    jam_ranking = sorted(results.items(), key=lambda x: x[1]['traffic_jam_length'])
     print("\nRanking po długości korków (najlepszy → najgorszy):")
-    for i, (variant, data) in enumerate(jam_ranking, 1):
-        print(f"   {i}. Wariant {variant}: {data['traffic_jam_length']:.2f} km")
+    for i, variant in enumerate(rankings['jam'], 1):
+        print(f"   {i}. Wariant {variant}: {results[variant]['traffic_jam_length']:.2f} km")
     
-    completion_ranking = sorted(results.items(), key=lambda x: x[1].get('completion_rate', 100.0), reverse=True)
     print("\nRanking po wskaźniku ukończenia podróży (najlepszy → najgorszy):")
-    for i, (variant, data) in enumerate(completion_ranking, 1):
+    for i, variant in enumerate(rankings['completion'], 1):
+        data = results[variant]
         completion_rate = data.get('completion_rate', 100.0)
         in_queue = data.get('vehicles_in_queue', 0)
         in_traffic = data.get('vehicles_in_traffic', 0)
@@ -604,14 +715,46 @@ def display_rankings(results: Dict[str, Any]):
             
         print(f"   {i}. Wariant {variant}: {completion_rate:.1f}%{status_info}")
     
-    throughput_ranking = sorted(results.items(), key=lambda x: x[1].get('total_entered', x[1]['total_vehicles']), reverse=True)
     print("\nRanking po przepustowości (najlepszy → najgorszy):")
-    for i, (variant, data) in enumerate(throughput_ranking, 1):
+    for i, variant in enumerate(rankings['throughput'], 1):
+        data = results[variant]
         total_entered = data.get('total_entered', data['total_vehicles'])
         completed = data['total_vehicles']
         print(f"   {i}. Wariant {variant}: {total_entered} wjechało, {completed} ukończyło")
 
 
+STANDARD_VARIANTS = frozenset({'A', 'B', 'C', 'D'})
+
+# Liczba zwykłych pasów wariantów bez buspasa oraz (pasy, wariant odniesienia) wariantów z buspasem
+NO_BUS_VARIANT_LANES = {'A': 3, 'D': 4}
+BUS_VARIANT_LANES = {'B': (2, None), 'C': (3, 'A')}
+
+
+def format_change(base_throughput: float, base_completion: float, throughput: float, completion: float) -> str:
+    """Formatuje względną zmianę przepustowości i ukończenia podróży względem wariantu bazowego"""
+    throughput_change = (throughput - base_throughput) / base_throughput * 100
+    completion_change = completion - base_completion
+    return f"{throughput_change:+.1f}% przepustowości, {completion_change:+.1f}% ukończenia"
+
+
+def print_pair_comparison(left_label: str, left_data: Dict[str, Any], right_label: str, right_data: Dict[str, Any]):
+    """Wyświetla porównanie wariantu bez buspasa (left) z wariantem z buspasem (right)"""
+    left_entered = left_data.get('total_entered', 0)
+    right_entered = right_data.get('total_entered', 0)
+    left_completion = left_data.get('completion_rate', 0)
+    right_completion = right_data.get('completion_rate', 0)
+    
+    print(f"   • Przepustowość: {left_label}={left_entered} vs {right_label}={right_entered} pojazdów")
+    print(f"   • Ukończenie podróży: {left_label}={left_completion:.1f}% vs {right_label}={right_completion:.1f}%")
+    print(f"   • Długość korków: {left_label}={left_data.get('traffic_jam_length', 0):.2f} vs "
+          f"{right_label}={right_data.get('traffic_jam_length', 0):.2f} km")
+    print(f"   • Efektywność buspasa {right_label}: {right_data['bus_efficiency']:.1f}%")
+    
+    if left_entered > 0 and right_entered > 0:
+        change = format_change(left_entered, left_completion, right_entered, right_completion)
+        print(f"   Buspas wpływ: {change}")
+
+
 def display_hypotheses_verification(results: Dict[str, Any]):
     """Wyświetla weryfikację hipotez badawczych"""
     print("\n" + "="*60)
@@ -622,54 +765,32 @@ def display_hypotheses_verification(results: Dict[str, Any]):
     
     print("\n   PORÓWNANIE A vs B (3 pasy vs 2 pasy + buspas):")
     if 'A' in results and 'B' in results:
-        a_data = results['A']
-        b_data = results['B'] 
-        
-        print(f"   • Przepustowość: A={a_data.get('total_entered', 0)} vs B={b_data.get('total_entered', 0)} pojazdów")
-        print(f"   • Ukończenie podróży: A={a_data.get('completion_rate', 0):.1f}% vs B={b_data.get('completion_rate', 0):.1f}%")
-        print(f"   • Długość korków: A={a_data.get('traffic_jam_length', 0):.2f} vs B={b_data.get('traffic_jam_length', 0):.2f} km")
-        print(f"   • Efektywność buspasa B: {b_data.get('bus_efficiency', 0):.1f}%")
-        
-        if a_data.get('total_entered', 0) > 0 and b_data.get('total_entered', 0) > 0:
-            throughput_change = ((b_data.get('total_entered', 0) - a_data.get('total_entered', 0)) / a_data.get('total_entered', 0) * 100)
-            completion_change = b_data.get('completion_rate', 0) - a_data.get('completion_rate', 0)
-            print(f"   Buspas wpływ: {throughput_change:+.1f}% przepustowości, {completion_change:+.1f}% ukończenia")
+        print_pair_comparison('A', results['A'], 'B', results['B'])
     
     print("\n   PORÓWNANIE A vs C (3 pasy vs 3 pasy + buspas):")
     if 'A' in results and 'C' in results:
-        a_data = results['A']
-        c_data = results['C']
-        
-        print(f"   • Przepustowość: A={a_data.get('total_entered', 0)} vs C={c_data.get('total_entered', 0)} pojazdów")
-        print(f"   • Ukończenie podróży: A={a_data.get('completion_rate', 0):.1f}% vs C={c_data.get('completion_rate', 0):.1f}%")
-        print(f"   • Długość korków: A={a_data.get('traffic_jam_length', 0):.2f} vs C={c_data.get('traffic_jam_length', 0):.2f} km")
-        print(f"   • Efektywność buspasa C: {c_data.get('bus_efficiency', 0):.1f}%")
-        
-        if a_data.get('total_entered', 0) > 0 and c_data.get('total_entered', 0) > 0:
-            throughput_change = ((c_data.get('total_entered', 0) - a_data.get('total_entered', 0)) / a_data.get('total_entered', 0) * 100)
-            completion_change = c_data.get('completion_rate', 0) - a_data.get('completion_rate', 0)
-            print(f"   Buspas wpływ: {throughput_change:+.1f}% przepustowości, {completion_change:+.1f}% ukończenia")
+        print_pair_comparison('A', results['A'], 'C', results['C'])
+    
+    standard_variants = []
+    variants_with_bus = []
+    variants_without_bus = []
+    for variant, data in results.items():
+        if variant not in STANDARD_VARIANTS:
+            continue
+        standard_variants.append((variant, data))
+        (variants_with_bus if data['has_bus_efficiency'] else variants_without_bus).append((variant, data))
     
-    variants_with_bus = [(k, v) for k, v in results.items() if v['bus_efficiency'] > 0 and k in ['A', 'B', 'C', 'D']]
     if variants_with_bus:
         avg_bus_efficiency = sum(v['bus_efficiency'] for _, v in variants_with_bus) / len(variants_with_bus)
         print(f"\n   Średnia efektywność buspasa (standardowe warianty): {avg_bus_efficiency:.1f}%")
     
     print("\n2. Hipoteza: Większa liczba pasów zwiększa przepustowość - porównanie wariantów bez buspasa.")
     
-    no_bus_variants = []
-    lanes = 0
-    
-    for variant, data in results.items():
-        if variant in ['A', 'D'] and data['bus_efficiency'] == 0:
-            if variant == 'A': 
-                lanes = 3
-            elif variant == 'D': 
-                lanes = 4
-            
-            total_entered = data.get('total_entered', data['total_vehicles'])
-            completion_rate = data.get('completion_rate', 0)
-            no_bus_variants.append((variant, lanes, total_entered, completion_rate))
+    no_bus_variants = [
+        (variant, NO_BUS_VARIANT_LANES[variant], data.get('total_entered', data['total_vehicles']),
+         data.get('completion_rate', 0))
+        for variant, data in variants_without_bus if variant in NO_BUS_VARIANT_LANES
+    ]
     
     if len(no_bus_variants) >= 2:
         no_bus_variants.sort(key=lambda x: x[1])
@@ -688,26 +809,13 @@ def display_hypotheses_verification(results: Dict[str, Any]):
             print(f"   {lanes_added} dodatkowy pas: {throughput_change:+.1f}% przepustowości, {completion_change:+.1f}% ukończenia")
     
     print("\n   PORÓWNANIE WPŁYWU BUSPASA PRZY RÓŻNEJ LICZBIE PASÓW:")
-    bus_variants = []
-    base_lanes = 0
-    comparison_variant = None
-
-    for variant, data in results.items():
-        if variant in ['B', 'C'] and data['bus_efficiency'] > 0:
-            if variant == 'B':
-                base_lanes = 2
-                comparison_variant = None
-            elif variant == 'C':
-                base_lanes = 3
-                comparison_variant = 'A'
-            
-            throughput = data.get('total_entered', data['total_vehicles'])
-            completion = data.get('completion_rate', 0)
-            efficiency = data.get('bus_efficiency', 0)
-            
-            bus_variants.append((variant, base_lanes, throughput, completion, efficiency, comparison_variant))
+    bus_variants = [
+        (variant, *BUS_VARIANT_LANES[variant], data.get('total_entered', data['total_vehicles']),
+         data.get('completion_rate', 0), data['bus_efficiency'])
+        for variant, data in variants_with_bus if variant in BUS_VARIANT_LANES
+    ]
     
-    for variant, lanes, throughput, completion, efficiency, comparison in bus_variants:
+    for variant, lanes, comparison, throughput, completion, efficiency in bus_variants:
         print(f"   • Wariant {variant}: {lanes} pasy + buspas → {throughput} pojazdów ({completion:.1f}% ukończenia, {efficiency:.1f}% efektywność)")
         
         if comparison and comparison in results:
@@ -716,14 +824,13 @@ def display_hypotheses_verification(results: Dict[str, Any]):
             comp_completion = comp_data.get('completion_rate', 0)
             
             if comp_throughput > 0:
-                throughput_gain = ((throughput - comp_throughput) / comp_throughput * 100)
-                completion_gain = completion - comp_completion
-                print(f"     vs {comparison}: {throughput_gain:+.1f}% przepustowości, {completion_gain:+.1f}% ukończenia")
+                change = format_change(comp_throughput, comp_completion, throughput, completion)
+                print(f"     vs {comparison}: {change}")
     
     print("\n3. Hipoteza: Wskaźnik ukończenia podróży jest kluczowy - analiza tylko standardowych wariantów.")
     
     standard_completion_rates = [(k, v.get('completion_rate', 100.0), v.get('vehicles_in_queue', 0), v.get('vehicles_in_traffic', 0)) 
-                                for k, v in results.items() if k in ['A', 'B', 'C', 'D']]
+                                for k, v in standard_variants]
     standard_completion_rates.sort(key=lambda x: x[1], reverse=True)
     
     if standard_completion_rates:
@@ -746,34 +853,32 @@ def display_hypotheses_verification(results: Dict[str, Any]):
                 print(f"   • {variant}: {queue_ratio:.0f}% problem kolejki, {traffic_ratio:.0f}% problem korków")
 
 
-def display_recommendations(results: Dict[str, Any]):
+@buffered_output()
+def display_recommendations(results: Dict[str, Any], rankings: Optional[Dict[str, List[str]]] = None):
     """Wyświetla rekomendacje"""
+    if rankings is None:
+        rankings = compute_rankings(results, limit=3)
+    
     print("\n" + "="*60)
     print("REKOMENDACJE")
     print("="*60)
     
-    travel_time_ranking = sorted(results.items(), key=lambda x: x[1]['avg_travel_time'])
-    speed_ranking = sorted(results.items(), key=lambda x: x[1]['avg_speed'], reverse=True)
-    jam_ranking = sorted(results.items(), key=lambda x: x[1]['traffic_jam_length'])
-    completion_ranking = sorted(results.items(), key=lambda x: x[1].get('completion_rate', 100.0), reverse=True)
-    throughput_ranking = sorted(results.items(), key=lambda x: x[1].get('total_entered', x[1]['total_vehicles']), reverse=True)
-    
-    best_travel_time = travel_time_ranking[0]
-    best_speed = speed_ranking[0]
-    best_jam = jam_ranking[0]
-    best_completion = completion_ranking[0]
-    best_throughput = throughput_ranking[0]
+    best_travel_time = rankings['travel_time'][0]
+    best_speed = rankings['speed'][0]
+    best_jam = rankings['jam'][0]
+    best_completion = rankings['completion'][0]
+    best_throughput = rankings['throughput'][0]
     
-    print(f"NAJKRÓTSZY CZAS PODRÓŻY: Wariant {best_travel_time[0]} ({best_travel_time[1]['avg_travel_time']:.1f}s)")
-    print(f"NAJSZYBSZY: Wariant {best_speed[0]} ({best_speed[1]['avg_speed']:.1f} km/h)")
-    print(f"NAJMNIEJ KORKÓW: Wariant {best_jam[0]} ({best_jam[1]['traffic_jam_length']:.2f} km)")
-    print(f"NAJWYŻSZY WSKAŹNIK UKOŃCZENIA: Wariant {best_completion[0]} ({best_completion[1].get('completion_rate', 100.0):.1f}%)")
-    print(f"NAJWYŻSZA PRZEPUSTOWOŚĆ: Wariant {best_throughput[0]} ({best_throughput[1].get('total_entered', best_throughput[1]['total_vehicles'])} pojazdów)")
+    print(f"NAJKRÓTSZY CZAS PODRÓŻY: Wariant {best_travel_time} ({results[best_travel_time]['avg_travel_time']:.1f}s)")
+    print(f"NAJSZYBSZY: Wariant {best_speed} ({results[best_speed]['avg_speed']:.1f} km/h)")
+    print(f"NAJMNIEJ KORKÓW: Wariant {best_jam} ({results[best_jam]['traffic_jam_length']:.2f} km)")
+    print(f"NAJWYŻSZY WSKAŹNIK UKOŃCZENIA: Wariant {best_completion} ({results[best_completion].get('completion_rate', 100.0):.1f}%)")
+    print(f"NAJWYŻSZA PRZEPUSTOWOŚĆ: Wariant {best_throughput} ({results[best_throughput].get('total_entered', results[best_throughput]['total_vehicles'])} pojazdów)")
     
     print(f"\nANALIZA KOMPROMISOWA:")
-    top3_travel = [x[0] for x in travel_time_ranking[:3]]
-    top3_completion = [x[0] for x in completion_ranking[:3]]
-    top3_throughput = [x[0] for x in throughput_ranking[:3]]
+    top3_travel = rankings['travel_time'][:3]
+    top3_completion = rankings['completion'][:3]
+    top3_throughput = rankings['throughput'][:3]
     
     balanced_variants = []
     for variant in results.keys():
@@ -784,10 +889,8 @@ def display_recommendations(results: Dict[str, Any]):
         if score > 0:
             balanced_variants.append((variant, score))
     
-    balanced_variants.sort(key=lambda x: x[1], reverse=True)
-    
     if balanced_variants:
-        best_balanced = balanced_variants[0]
+        best_balanced = max(balanced_variants, key=itemgetter(1))
         print(f"• Najlepszy kompromis: Wariant {best_balanced[0]} (wynik: {best_balanced[1]}/6)")
         
         data = results[best_balanced[0]]
@@ -795,5 +898,5 @@ def display_recommendations(results: Dict[str, Any]):
         print(f"  - Przepustowość: {data.get('total_entered', data['total_vehicles'])} pojazdów")
         print(f"  - Wskaźnik ukończenia: {data.get('completion_rate', 100.0):.1f}%")
     
-    if 'C' in [best_travel_time[0], best_speed[0], best_jam[0]]:
+    if 'C' in [best_travel_time, best_speed, best_jam]:
         print("\nKonfiguracja zoptymalizowana (Wariant C) wykazuje najlepsze wyniki!")
\ No newline at end of file
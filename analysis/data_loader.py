@@ -3,10 +3,12 @@ Data loading and processing functions for simulation analysis
 """
 
 import os
-import pandas as pd
+import csv
+import importlib.util
 import numpy as np
-import glob
-from typing import Dict, Any
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from simulation.constants import (
     VEHICLE_TOTAL_SPACE,
     SLOW_TRAFFIC_THRESHOLD,
@@ -15,20 +17,100 @@ from simulation.constants import (
     BUS_EFFICIENCY_SPEED_WEIGHT
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-def load_raw_simulation_data(data_dir: str, pattern: str) -> Dict[str, Any]:
+
+SIMULATION_FILE_SUFFIXES = ('_vehicles.csv', '_config.csv', '_timeseries.csv', '_lane_capacity.csv')
+
+# Kolumny *_vehicles.csv potrzebne do statystyk (kolumna 'lane' nie jest czytana)
+VEHICLE_COLUMNS = (
+    'vehicle_id', 'timestamp', 'action', 'vehicle_type', 'position', 'speed',
+    'travel_time', 'waiting_time', 'will_turn', 'turn_position'
+)
+
+# Kolumny o kilku wartościach - filtry porównują kody kategorii zamiast napisów
+VEHICLE_DTYPES = {'action': 'category', 'vehicle_type': 'category', 'will_turn': bool}
+
+# Zdarzenia z pliku *_vehicles.csv: zakończenie przejazdu oraz wjazd na drogę
+COMPLETED_ACTIONS = ('exited', 'turned')
+MOVING_ACTIONS = ('entered', 'entered_from_queue')
+
+# Pliki *_vehicles.csv większe niż próg są czytane strumieniowo, fragmentami po VEHICLE_CHUNK_SIZE wierszy
+VEHICLE_STREAMING_THRESHOLD = 64 * 1024 * 1024
+VEHICLE_CHUNK_SIZE = 200_000
+
+# Silnik pyarrow parsuje CSV wielowątkowo; bez pyarrow zostaje domyślny silnik C
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+
+
+@lru_cache(maxsize=8)
+def _scan_simulation_dir(data_dir: str, mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """Jednorazowy odczyt katalogu - wynik ważny dopóki nie zmieni się mtime katalogu"""
+    index = {suffix: {} for suffix in SIMULATION_FILE_SUFFIXES}
+    
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            for suffix in SIMULATION_FILE_SUFFIXES:
+                if entry.name.endswith(suffix):
+                    index[suffix][entry.name[:-len(suffix)]] = entry.path
+                    break
+    
+    return index
+
+
+def index_simulation_files(data_dir: str) -> Optional[Dict[str, Dict[str, str]]]:
+    """Indeksuje pliki symulacji w katalogu jednym przejściem os.scandir
+    
+    Args:
+        data_dir: katalog z danymi
+    
+    Returns:
+        Dict {sufiks pliku: {prefiks nazwy: ścieżka}}, np. index['_vehicles.csv']['variant_a_...'],
+        lub None gdy katalog nie istnieje
+    """
+    try:
+        mtime_ns = os.stat(data_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    
+    return _scan_simulation_dir(data_dir, mtime_ns)
+
+
+def find_simulation_files(index: Dict[str, Dict[str, str]], pattern: str, suffix: str) -> List[str]:
+    """Zwraca ścieżki plików z danym sufiksem, których prefiks zawiera wzorzec"""
+    return [path for stem, path in index[suffix].items() if pattern in stem]
+
+
+def available_patterns(index: Dict[str, Dict[str, str]], patterns: List[str]) -> List[str]:
+    """Zwraca te wzorce, dla których w indeksie są pliki pojazdów i konfiguracji"""
+    vehicle_stems = index['_vehicles.csv']
+    config_stems = index['_config.csv']
+    return [
+        pattern for pattern in patterns
+        if any(pattern in stem for stem in vehicle_stems) and any(pattern in stem for stem in config_stems)
+    ]
+
+
+def load_raw_simulation_data(data_dir: str, pattern: str,
+                             index: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
     """Ładuje surowe dane symulacji z plików CSV i oblicza statystyki
     
     Args:
         data_dir: katalog z danymi
         pattern: wzorzec nazwy pliku (np. 'scenario_a', 'variant_b')
+        index: gotowy indeks z index_simulation_files (pomija ponowny odczyt katalogu)
     
     Returns:
         Dict ze statystykami obliczonymi z surowych danych
     """
-    vehicle_files = glob.glob(os.path.join(data_dir, f"*{pattern}*_vehicles.csv"))
-    config_files = glob.glob(os.path.join(data_dir, f"*{pattern}*_config.csv"))
-    timeseries_files = glob.glob(os.path.join(data_dir, f"*{pattern}*_timeseries.csv"))
+    if index is None:
+        index = index_simulation_files(data_dir)
+        if index is None:
+            return {}
+    
+    vehicle_files = find_simulation_files(index, pattern, '_vehicles.csv')
+    config_files = find_simulation_files(index, pattern, '_config.csv')
     
     if not vehicle_files or not config_files:
         return {}
@@ -37,44 +119,246 @@ def load_raw_simulation_data(data_dir: str, pattern: str) -> Dict[str, Any]:
     config_file = sorted(config_files, key=os.path.getmtime, reverse=True)[0]
     
     try:
-        vehicles_df = pd.read_csv(vehicle_file)
-        config_df = pd.read_csv(config_file)
-        
-        stats = calculate_statistics_from_raw_data(vehicles_df, config_df.iloc[0])
-        
-        stats = dict(stats)
-        stats['source_file'] = os.path.basename(vehicle_file)
-        stats['config_file'] = os.path.basename(config_file)
-        
-        return stats
+        return load_simulation_stats_from_files(vehicle_file, config_file)
         
     except Exception as e:
         print(f"Błąd przy ładowaniu danych z {pattern}: {e}")
         return {}
 
 
-def calculate_statistics_from_raw_data(vehicles_df: pd.DataFrame, config: pd.Series) -> Dict[str, Any]:
+def load_many_simulation_data(data_dir: str, patterns: List[str],
+                              index: Optional[Dict[str, Dict[str, str]]] = None,
+                              max_workers: int = 8) -> Dict[str, Dict[str, Any]]:
+    """Ładuje dane dla wielu wzorców równolegle (wątki - odczyt i parsowanie CSV)
+    
+    Args:
+        data_dir: katalog z danymi
+        patterns: wzorce nazw plików
+        index: gotowy indeks z index_simulation_files
+        max_workers: maksymalna liczba wątków
+    
+    Returns:
+        Dict {wzorzec: statystyki} (pusty słownik statystyk, gdy brak danych)
+    """
+    if index is None:
+        index = index_simulation_files(data_dir)
+        if index is None:
+            return {}
+    
+    unique_patterns = list(dict.fromkeys(patterns))
+    if len(unique_patterns) <= 1:
+        return {pattern: load_raw_simulation_data(data_dir, pattern, index) for pattern in unique_patterns}
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_patterns))) as executor:
+        loaded = executor.map(lambda pattern: load_raw_simulation_data(data_dir, pattern, index), unique_patterns)
+        return dict(zip(unique_patterns, loaded))
+
+
+def load_simulation_stats_from_files(vehicle_file: str, config_file: str) -> Dict[str, Any]:
+    """Oblicza statystyki dla konkretnej pary plików vehicles/config
+    
+    Wynik jest zapamiętywany per plik (z jego mtime i rozmiarem), więc kilka wzorców
+    wskazujących na ten sam plik nie powoduje ponownego parsowania CSV.
+    
+    Args:
+        vehicle_file: ścieżka do pliku *_vehicles.csv
+        config_file: ścieżka do pliku *_config.csv
+    
+    Returns:
+        Dict ze statystykami (kopia - można ją modyfikować); pod kluczem 'config'
+        wczytana konfiguracja symulacji
+    """
+    vehicle_stat = os.stat(vehicle_file)
+    config_stat = os.stat(config_file)
+    stats = _cached_file_stats(
+        vehicle_file, config_file,
+        (vehicle_stat.st_mtime_ns, vehicle_stat.st_size),
+        (config_stat.st_mtime_ns, config_stat.st_size)
+    )
+    return dict(stats, config=dict(stats['config']))
+
+
+@lru_cache(maxsize=64)
+def _cached_file_stats(vehicle_file: str, config_file: str,
+                       vehicle_version: Tuple[int, int], config_version: Tuple[int, int]) -> Dict[str, Any]:
+    config = read_simulation_config(config_file)
+    
+    if vehicle_version[1] > VEHICLE_STREAMING_THRESHOLD:
+        stats = calculate_statistics_from_log_summary(*read_vehicle_log_summary(vehicle_file), config)
+    else:
+        stats = calculate_statistics_from_raw_data(read_vehicle_log(vehicle_file), config)
+    
+    stats = dict(stats)
+    stats['source_file'] = os.path.basename(vehicle_file)
+    stats['config_file'] = os.path.basename(config_file)
+    stats['config'] = config
+    
+    return stats
+
+
+def vehicle_log_columns(vehicle_file: str) -> List[str]:
+    """Zwraca kolumny z VEHICLE_COLUMNS obecne w nagłówku pliku *_vehicles.csv
+    
+    Brakujące kolumny są pomijane, więc pliki zapisane przed dodaniem kolumny nadal się wczytują.
+    """
+    with open(vehicle_file, newline='') as fh:
+        header = next(csv.reader(fh), [])
+    return [column for column in header if column in VEHICLE_COLUMNS]
+
+
+def read_vehicle_log(vehicle_file: str, engine: str = CSV_ENGINE) -> 'pd.DataFrame':
+    """Wczytuje plik *_vehicles.csv (tylko kolumny potrzebne do statystyk)
+    
+    Args:
+        vehicle_file: ścieżka pliku
+        engine: silnik pd.read_csv - 'pyarrow' albo 'c' (oba czytają ten sam zbiór kolumn)
+    """
+    import pandas as pd
+    
+    columns = vehicle_log_columns(vehicle_file)
+    dtypes = {column: dtype for column, dtype in VEHICLE_DTYPES.items() if column in columns}
+    return pd.read_csv(vehicle_file, engine=engine, usecols=columns, dtype=dtypes)
+
+
+def read_vehicle_log_summary(vehicle_file: str,
+                             chunksize: int = VEHICLE_CHUNK_SIZE) -> Tuple['pd.DataFrame', np.ndarray, 'pd.DataFrame']:
+    """Czyta duży plik *_vehicles.csv fragmentami, zachowując tylko dane potrzebne do statystyk
+    
+    Pamięć zależy od rozmiaru fragmentu i liczby pojazdów, a nie od rozmiaru pliku.
+    
+    Returns:
+        Krotka jak z split_vehicle_log: (zakończone przejazdy, id pojazdów, które wjechały,
+        ostatni wpis każdego pojazdu)
+    """
+    import pandas as pd
+    
+    completed_parts = []
+    entered_parts = []
+    latest_parts = []
+    
+    columns = vehicle_log_columns(vehicle_file)
+    dtypes = {column: dtype for column, dtype in VEHICLE_DTYPES.items() if column in columns}
+    
+    with pd.read_csv(vehicle_file, usecols=columns, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            completed, entered_ids, latest = split_vehicle_log(chunk)
+            completed_parts.append(completed)
+            entered_parts.append(entered_ids)
+            latest_parts.append(latest)
+    
+    if not completed_parts:
+        return split_vehicle_log(read_vehicle_log(vehicle_file))
+    
+    # Fragmenty mogą mieć różne zbiory kategorii - łączenie daje object, więc kategorie są odtwarzane
+    completed = pd.concat(completed_parts, ignore_index=True).astype(VEHICLE_DTYPES)
+    latest = latest_vehicle_records(pd.concat(latest_parts, ignore_index=True).astype(VEHICLE_DTYPES))
+    
+    return completed, np.unique(np.concatenate(entered_parts)), latest
+
+
+def parse_config_value(value: str) -> Any:
+    """Zamienia tekst z pliku konfiguracji na bool/int/float (pusta wartość -> None)"""
+    if value == '':
+        return None
+    if value in ('True', 'False'):
+        return value == 'True'
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def read_simulation_config(config_file: str) -> Dict[str, Any]:
+    """Wczytuje jednowierszowy plik *_config.csv jako słownik z przekonwertowanymi wartościami"""
+    with open(config_file, newline='') as fh:
+        row = next(csv.DictReader(fh), None)
+    
+    if row is None:
+        raise ValueError(f"Pusty plik konfiguracji: {config_file}")
+    
+    return {key: parse_config_value(value) for key, value in row.items()}
+
+
+def clear_simulation_cache() -> None:
+    """Czyści zapamiętany indeks katalogu i statystyki plików"""
+    _scan_simulation_dir.cache_clear()
+    _cached_file_stats.cache_clear()
+
+
+def latest_vehicle_records(vehicles_df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Zwraca ostatni (najpóźniejszy) wpis każdego pojazdu
+    
+    Symulacja zapisuje zdarzenia chronologicznie, więc sortowanie jest
+    wykonywane tylko wtedy, gdy kolumna timestamp nie jest rosnąca.
+    """
+    if not vehicles_df['timestamp'].is_monotonic_increasing:
+        vehicles_df = vehicles_df.sort_values('timestamp', kind='stable')
+    return vehicles_df.drop_duplicates('vehicle_id', keep='last')
+
+
+def action_mask(actions: 'pd.Series', values: Tuple[str, ...]) -> np.ndarray:
+    """Maska wierszy, których akcja należy do values
+    
+    Dla kolumny kategorycznej porównywane są kody całkowite kategorii zamiast napisów.
+    """
+    if actions.dtype.name == 'category':
+        categories = actions.cat.categories
+        codes = [categories.get_loc(value) for value in values if value in categories]
+        return np.isin(actions.cat.codes.to_numpy(), codes)
+    return actions.isin(values).to_numpy()
+
+
+def split_vehicle_log(vehicles_df: 'pd.DataFrame') -> Tuple['pd.DataFrame', np.ndarray, 'pd.DataFrame']:
+    """Wydziela z logu pojazdów dane potrzebne do statystyk
+    
+    Returns:
+        Krotka (wiersze zakończonych przejazdów, posortowane id pojazdów, które wjechały na drogę,
+        ostatni wpis każdego pojazdu)
+    """
+    actions = vehicles_df['action']
+    completed_mask = action_mask(actions, COMPLETED_ACTIONS)
+    entered_mask = completed_mask | action_mask(actions, MOVING_ACTIONS)
+    
+    entered_ids = np.unique(vehicles_df['vehicle_id'].to_numpy()[entered_mask])
+    
+    return vehicles_df[completed_mask], entered_ids, latest_vehicle_records(vehicles_df)
+
+
+def calculate_statistics_from_raw_data(vehicles_df: 'pd.DataFrame', config: Dict[str, Any]) -> Dict[str, Any]:
     """Oblicza statystyki z surowych danych o pojazdach
     
     Args:
         vehicles_df: DataFrame z danymi o pojazdach
-        config: Series z konfiguracją symulacji
+        config: konfiguracja symulacji (słownik lub wiersz pd.Series)
     
     Returns:
         Dict ze statystykami
     """
-    completed = vehicles_df[vehicles_df['action'].isin(['exited', 'turned'])].copy()
+    return calculate_statistics_from_log_summary(*split_vehicle_log(vehicles_df), config)
+
+
+def calculate_statistics_from_log_summary(completed: 'pd.DataFrame', entered_ids: np.ndarray,
+                                          latest_positions: 'pd.DataFrame', config: Dict[str, Any]) -> Dict[str, Any]:
+    """Oblicza statystyki z wyniku split_vehicle_log / read_vehicle_log_summary
     
-    all_entered = vehicles_df[vehicles_df['action'].isin(['entered', 'entered_from_queue', 'exited', 'turned'])].copy()
-    total_entered = len(all_entered['vehicle_id'].unique()) if not all_entered.empty else 0
+    Args:
+        completed: wiersze zakończonych przejazdów
+        entered_ids: unikalne id pojazdów, które wjechały na drogę
+        latest_positions: ostatni wpis każdego pojazdu
+        config: konfiguracja symulacji
     
-    completed_ids = set(completed['vehicle_id'].unique()) if not completed.empty else set()
-    entered_ids = set(all_entered['vehicle_id'].unique()) if not all_entered.empty else set()
-    incomplete_count = len(entered_ids - completed_ids)
+    Returns:
+        Dict ze statystykami
+    """
+    completed_ids = np.unique(completed['vehicle_id'].to_numpy())
+    total_entered = entered_ids.size
+    incomplete_count = int(np.setdiff1d(entered_ids, completed_ids, assume_unique=True).size)
     
-    latest_positions = vehicles_df.loc[vehicles_df.groupby('vehicle_id')['timestamp'].idxmax()]
-    vehicles_in_queue = len(latest_positions[latest_positions['action'] == 'queued'])
-    vehicles_in_traffic = len(latest_positions[latest_positions['action'].isin(['entered', 'entered_from_queue'])])
+    latest_actions = latest_positions['action'].value_counts()
+    vehicles_in_queue = int(latest_actions.get('queued', 0))
+    vehicles_in_traffic = int(sum(latest_actions.get(action, 0) for action in MOVING_ACTIONS))
     
     if completed.empty:
         return {
@@ -96,23 +380,13 @@ def calculate_statistics_from_raw_data(vehicles_df: pd.DataFrame, config: pd.Ser
     avg_travel_time = completed['travel_time'].mean()
     avg_waiting_time = completed['waiting_time'].mean()
     
-    speeds = []
-    road_length = float(config['road_length'])
-    
-    for _, vehicle in completed.iterrows():
-        if vehicle['travel_time'] > 0:
-            if vehicle['will_turn'] and pd.notna(vehicle['turn_position']):
-                distance = float(vehicle['turn_position'])
-            else:
-                distance = road_length
-            avg_speed = (distance / vehicle['travel_time']) * 3600
-            speeds.append(avg_speed)
+    vehicle_speeds = calculate_vehicle_speeds(completed, float(config['road_length']))
+    speeds = vehicle_speeds[~np.isnan(vehicle_speeds)]
+    avg_speed = np.mean(speeds) if speeds.size else 0.0
     
-    avg_speed = np.mean(speeds) if speeds else 0.0
+    traffic_jam_length = _jam_length_from_latest(latest_positions)
     
-    traffic_jam_length = calculate_jam_length_from_data(vehicles_df)
-    
-    bus_efficiency = calculate_bus_efficiency_from_data(completed, config)
+    bus_efficiency = calculate_bus_efficiency_from_data(completed, config, vehicle_speeds=vehicle_speeds)
     
     return {
         'total_vehicles': total_vehicles,
@@ -129,10 +403,35 @@ def calculate_statistics_from_raw_data(vehicles_df: pd.DataFrame, config: pd.Ser
     }
 
 
-def calculate_jam_length_from_data(vehicles_df: pd.DataFrame) -> float:
-    """Oblicza długość korka na podstawie danych o pojazdach"""
-    latest_positions = vehicles_df.loc[vehicles_df.groupby('vehicle_id')['timestamp'].idxmax()]
-    moving_vehicles = latest_positions[latest_positions['action'].isin(['entered', 'entered_from_queue'])]
+def calculate_vehicle_speeds(vehicles_df: 'pd.DataFrame', road_length: float) -> np.ndarray:
+    """Oblicza średnią prędkość [km/h] każdego wiersza (NaN, gdy czas przejazdu <= 0)
+    
+    Pojazdy skręcające z podaną pozycją skrętu przejeżdżają tylko do tej pozycji,
+    pozostałe całą długość drogi. Wynik jest wyrównany z wierszami vehicles_df.
+    """
+    travel_time = vehicles_df['travel_time'].to_numpy(dtype=float)
+    turn_position = vehicles_df['turn_position'].to_numpy(dtype=float)
+    will_turn = vehicles_df['will_turn'].to_numpy(dtype=bool)
+    
+    distance = np.where(will_turn & ~np.isnan(turn_position), turn_position, road_length)
+    moving = travel_time > 0
+    speeds = np.full(len(travel_time), np.nan)
+    speeds[moving] = distance[moving] / travel_time[moving] * 3600
+    return speeds
+
+
+def calculate_jam_length_from_data(vehicles_df: 'pd.DataFrame') -> float:
+    """Oblicza długość korka na podstawie danych o pojazdach
+    
+    Args:
+        vehicles_df: DataFrame z danymi o pojazdach
+    """
+    return _jam_length_from_latest(latest_vehicle_records(vehicles_df))
+
+
+def _jam_length_from_latest(latest_positions: 'pd.DataFrame') -> float:
+    """Oblicza długość korka z ostatniego wpisu każdego pojazdu (wynik latest_vehicle_records)"""
+    moving_vehicles = latest_positions[latest_positions['action'].isin(MOVING_ACTIONS)]
     
     if moving_vehicles.empty:
         return 0.0
@@ -142,63 +441,60 @@ def calculate_jam_length_from_data(vehicles_df: pd.DataFrame) -> float:
     if slow_vehicles.empty:
         return 0.0
     
-    positions = sorted(slow_vehicles['position'].values)
+    positions = np.sort(slow_vehicles['position'].to_numpy(dtype=float))
     
     if len(positions) < 2:
         return VEHICLE_TOTAL_SPACE
     
-    max_jam_length = 0.0
-    current_jam_length = VEHICLE_TOTAL_SPACE
-    
-    for i in range(1, len(positions)):
-        gap = positions[i] - positions[i-1]
-        if gap < JAM_THRESHOLD_DISTANCE:
-            current_jam_length += VEHICLE_TOTAL_SPACE
-        else:
-            max_jam_length = max(max_jam_length, current_jam_length)
-            current_jam_length = VEHICLE_TOTAL_SPACE
+    # Nowy korek zaczyna się tam, gdzie odstęp do poprzedniego pojazdu >= JAM_THRESHOLD_DISTANCE
+    jam_starts = np.concatenate(([True], np.diff(positions) >= JAM_THRESHOLD_DISTANCE))
+    longest_jam = int(np.bincount(np.cumsum(jam_starts)).max())
     
-    return max(max_jam_length, current_jam_length)
+    # Dodawanie w pętli (a nie mnożenie) zachowuje dotychczasowe zaokrąglenia wyniku
+    jam_length = 0.0
+    for _ in range(longest_jam):
+        jam_length += VEHICLE_TOTAL_SPACE
+    return jam_length
 
 
-def calculate_bus_efficiency_from_data(completed_df: pd.DataFrame, config: pd.Series) -> float:
-    """Oblicza efektywność buspasa z danych o pojazdach"""
+def calculate_bus_efficiency_from_data(completed_df: 'pd.DataFrame', config: Dict[str, Any],
+                                       vehicle_speeds: Optional[np.ndarray] = None) -> float:
+    """Oblicza efektywność buspasa z danych o pojazdach
+    
+    Args:
+        completed_df: pojazdy, które zakończyły przejazd
+        config: konfiguracja symulacji
+        vehicle_speeds: wynik calculate_vehicle_speeds dla completed_df, jeśli już policzony
+    """
     has_bus_lane = config.get('has_bus_lane', False)
     
     if not has_bus_lane:
         return 0.0
     
-    bus_vehicles = completed_df[completed_df['vehicle_type'] == 'privileged']
-    regular_vehicles = completed_df[completed_df['vehicle_type'] == 'regular']
+    vehicle_types = completed_df['vehicle_type']
+    bus_mask = (vehicle_types == 'privileged').to_numpy()
+    regular_mask = (vehicle_types == 'regular').to_numpy()
     
-    if bus_vehicles.empty or regular_vehicles.empty:
+    if not bus_mask.any() or not regular_mask.any():
         return 0.0
     
-    avg_bus_time = bus_vehicles['travel_time'].mean()
-    avg_regular_time = regular_vehicles['travel_time'].mean()
+    travel_time = completed_df['travel_time']
+    avg_bus_time = travel_time[bus_mask].mean()
+    avg_regular_time = travel_time[regular_mask].mean()
     
     time_efficiency = max(0.0, (avg_regular_time - avg_bus_time) / avg_regular_time * 100)
     
-    bus_speeds = []
-    regular_speeds = []
-    road_length = float(config['road_length'])
-    
-    for _, vehicle in bus_vehicles.iterrows():
-        if vehicle['travel_time'] > 0:
-            distance = float(vehicle['turn_position']) if vehicle['will_turn'] and pd.notna(vehicle['turn_position']) else road_length
-            speed = (distance / vehicle['travel_time']) * 3600
-            bus_speeds.append(speed)
-    
-    for _, vehicle in regular_vehicles.iterrows():
-        if vehicle['travel_time'] > 0:
-            distance = float(vehicle['turn_position']) if vehicle['will_turn'] and pd.notna(vehicle['turn_position']) else road_length
-            speed = (distance / vehicle['travel_time']) * 3600
-            regular_speeds.append(speed)
+    if vehicle_speeds is None:
+        vehicle_speeds = calculate_vehicle_speeds(completed_df, float(config['road_length']))
+    bus_speeds = vehicle_speeds[bus_mask]
+    bus_speeds = bus_speeds[~np.isnan(bus_speeds)]
+    regular_speeds = vehicle_speeds[regular_mask]
+    regular_speeds = regular_speeds[~np.isnan(regular_speeds)]
     
-    if bus_speeds and regular_speeds:
+    if bus_speeds.size and regular_speeds.size:
         avg_bus_speed = np.mean(bus_speeds)
         avg_regular_speed = np.mean(regular_speeds)
         speed_efficiency = max(0.0, (avg_bus_speed - avg_regular_speed) / avg_regular_speed * 100)
         return float(time_efficiency * BUS_EFFICIENCY_TIME_WEIGHT + speed_efficiency * BUS_EFFICIENCY_SPEED_WEIGHT)
     
-    return float(time_efficiency)
\ No newline at end of file
+    return float(time_efficiency)
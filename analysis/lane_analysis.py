@@ -4,33 +4,63 @@ Lane capacity analysis functions
 
 import os
 import pandas as pd
-import glob
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from .data_loader import index_simulation_files, find_simulation_files
+from .output_utils import buffered_output
 
 
-def analyze_lane_capacity(data_dir: str, pattern: str) -> Dict[str, Any]:
+# Kolumny *_lane_capacity.csv używane w analizie (kolumna 'timestamp' nie jest czytana)
+LANE_CAPACITY_COLUMNS = (
+    'simulation_id', 'lane_id', 'lane_type', 'vehicle_count',
+    'actual_capacity_per_km', 'theoretical_capacity_per_km', 'utilization_percent'
+)
+
+# Numer pasa to drugi człon identyfikatora rozdzielonego '_' (np. 'lane_0' -> '0')
+LANE_NUMBER_PATTERN = r'^[^_]*_([^_]*)'
+
+
+def lane_details_records(regular_lanes: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Buduje listę szczegółów pasów regularnych operacjami na kolumnach"""
+    lane_ids = regular_lanes['lane_id'].astype(str)
+    details = pd.DataFrame({
+        'lane_number': lane_ids.str.extract(LANE_NUMBER_PATTERN, expand=False).fillna(lane_ids),
+        'vehicles': regular_lanes['vehicle_count'].astype(int),
+        'capacity_per_km': regular_lanes['actual_capacity_per_km'].round(1),
+        'utilization_percent': regular_lanes['utilization_percent'].round(1)
+    })
+    return details.to_dict('records')
+
+
+def analyze_lane_capacity(data_dir: str, pattern: str, file_path: Optional[str] = None) -> Dict[str, Any]:
     """Analizuje pojemność i wykorzystanie pasów z pliku lane_capacity.csv
     
     Args:
         data_dir: katalog z danymi
         pattern: wzorzec nazwy pliku (np. 'scenario_a', 'variant_b')
+        file_path: gotowa ścieżka pliku *_lane_capacity.csv (pomija wyszukiwanie w katalogu)
     
     Returns:
         Dict z analizą pojemności pasów
     """
-    capacity_files = glob.glob(os.path.join(data_dir, f"*{pattern}*_lane_capacity.csv"))
+    capacity_file = file_path
     
-    if not capacity_files:
-        return {'error': 'Brak pliku z danymi o pojemności pasów'}
-    
-    capacity_file = sorted(capacity_files, key=os.path.getmtime, reverse=True)[0]
+    if capacity_file is None:
+        index = index_simulation_files(data_dir)
+        capacity_files = find_simulation_files(index, pattern, '_lane_capacity.csv') if index else []
+        
+        if not capacity_files:
+            return {'error': 'Brak pliku z danymi o pojemności pasów'}
+        
+        capacity_file = max(capacity_files, key=os.path.getmtime)
     
     try:
-        df = pd.read_csv(capacity_file)
+        df = pd.read_csv(capacity_file, usecols=lambda column: column in LANE_CAPACITY_COLUMNS)
         
-        regular_lanes = df[df['lane_type'] == 'regular']
-        bus_lane = df[df['lane_type'] == 'bus']
-        summary = df[df['lane_type'] == 'summary']
+        lanes_by_type = dict(tuple(df.groupby('lane_type', sort=False)))
+        no_lanes = df.iloc[0:0]
+        regular_lanes = lanes_by_type.get('regular', no_lanes)
+        bus_lane = lanes_by_type.get('bus', no_lanes)
+        summary = lanes_by_type.get('summary', no_lanes)
         
         analysis = {
             'simulation_id': df['simulation_id'].iloc[0] if len(df) > 0 else '',
@@ -47,17 +77,8 @@ def analyze_lane_capacity(data_dir: str, pattern: str) -> Dict[str, Any]:
                 'min_utilization': round(regular_lanes['utilization_percent'].min(), 1),
                 'max_utilization': round(regular_lanes['utilization_percent'].max(), 1),
                 'theoretical_capacity': int(regular_lanes['theoretical_capacity_per_km'].iloc[0]) if len(regular_lanes) > 0 else 0,
-                'lane_details': []
+                'lane_details': lane_details_records(regular_lanes)
             }
-            
-            for _, row in regular_lanes.iterrows():
-                lane_num = row['lane_id'].split('_')[1] if '_' in str(row['lane_id']) else str(row['lane_id'])
-                analysis['regular_lanes']['lane_details'].append({
-                    'lane_number': lane_num,
-                    'vehicles': int(row['vehicle_count']),
-                    'capacity_per_km': round(row['actual_capacity_per_km'], 1),
-                    'utilization_percent': round(row['utilization_percent'], 1)
-                })
         
         if len(bus_lane) > 0:
             bus_row = bus_lane.iloc[0]
@@ -83,6 +104,7 @@ def analyze_lane_capacity(data_dir: str, pattern: str) -> Dict[str, Any]:
         return {'error': f'Błąd podczas analizy pojemności pasów: {str(e)}'}
 
 
+@buffered_output()
 def print_lane_capacity_analysis(analysis: Dict[str, Any]) -> None:
     """Wyświetla analizę pojemności pasów w czytelnej formie"""
     if 'error' in analysis:
@@ -129,24 +151,23 @@ def analyze_all_lane_capacities(data_dir: str = "simulation_data") -> Dict[str,
     Returns:
         Dict z analizą pojemności dla wszystkich symulacji
     """
-    capacity_files = glob.glob(os.path.join(data_dir, "*_lane_capacity.csv"))
+    index = index_simulation_files(data_dir)
+    capacity_files = index['_lane_capacity.csv'] if index else {}
     
     if not capacity_files:
         return {'error': 'Brak plików z danymi o pojemności pasów'}
     
     all_analyses = {}
     
-    for file_path in capacity_files:
-        filename = os.path.basename(file_path)
-        pattern = filename.replace('_lane_capacity.csv', '')
-        
-        analysis = analyze_lane_capacity(data_dir, pattern)
+    for pattern, file_path in capacity_files.items():
+        analysis = analyze_lane_capacity(data_dir, pattern, file_path=file_path)
         if 'error' not in analysis:
             all_analyses[pattern] = analysis
     
     return all_analyses
 
 
+@buffered_output()
 def print_all_lane_capacities_summary(data_dir: str = "simulation_data") -> None:
     """Wyświetla podsumowanie pojemności pasów dla wszystkich symulacji"""
     all_analyses = analyze_all_lane_capacities(data_dir)
@@ -0,0 +1,19 @@
+"""
+Output helpers shared by the analysis reports
+"""
+
+import io
+import sys
+from contextlib import contextmanager, redirect_stdout
+
+
+@contextmanager
+def buffered_output():
+    """Zbiera wydruk raportu w pamięci i wypisuje go na stdout jednym zapisem"""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+        sys.stdout.flush()
@@ -3,135 +3,145 @@ Visualization functions for simulation results
 """
 
 import os
-from typing import Dict, Any
+from itertools import cycle, islice
+from typing import Dict
 
 
-def create_visualization(results: Dict, filename_suffix: str = "wyniki", simulation_module=None):
-    """Tworzy wizualizację wyników symulacji"""
+# Wartości z wyników wariantów pokazywane na wykresach
+CHART_METRICS = (
+    'avg_travel_time', 'avg_speed', 'traffic_jam_length',
+    'avg_waiting_time', 'total_vehicles', 'bus_efficiency'
+)
+
+# Etykiety osi X dla wariantów standardowych i testów skrajnych
+VARIANT_CHART_LABELS = {
+    'A': 'A: 3P',
+    'B': 'B: 2P+Bus',
+    'C': 'C: 3P+Bus',
+    'D': 'D: 4P',
+    'minimal': 'MIN',
+    'maximal': 'MAX'
+}
+
+# Obsługiwane formaty pliku z wykresem (svg i pdf zapisywane wektorowo, bez rasteryzacji)
+CHART_FORMATS = ('png', 'svg', 'pdf')
+
+def create_visualization(results: Dict, filename_suffix: str = "wyniki", simulation_module=None,
+                         file_format: str = 'png'):
+    """Tworzy wizualizację wyników symulacji
+    
+    Args:
+        results: wyniki wariantów
+        filename_suffix: końcówka nazwy pliku z wykresem
+        simulation_module: moduł symulacji (etykiety wariantów standardowych)
+        file_format: 'png', 'svg' albo 'pdf'
+    """
+    if file_format not in CHART_FORMATS:
+        raise ValueError(f"Nieobsługiwany format wykresu: {file_format}")
+    
+    if not results:
+        print("Brak wyników do wizualizacji")
+        return
+    
     try:
-        import matplotlib.pyplot as plt
-        import numpy as np
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
         
         available_variants = list(results.keys())
         n_variants = len(available_variants)
         
-        if n_variants == 0:
-            print("Brak wyników do wizualizacji")
-            return
-        
         if simulation_module:
-            params = simulation_module.SimulationParameters()
-            
             variant_labels = {}
-            for var in available_variants:
-                base_name = {
-                    'A': 'A: 3P',
-                    'B': 'B: 2P+Bus', 
-                    'C': 'C: 3P+Bus',
-                    'D': 'D: 4P',
-                    'CUSTOM': f'CUSTOM_{available_variants.index(var)+1}',
-                    'minimal': 'MIN',
-                    'maximal': 'MAX'
-                }.get(var, var)
-                
+            for position, var in enumerate(available_variants, start=1):
                 if var.startswith('CUSTOM_'):
                     variant_labels[var] = var
+                elif var == 'CUSTOM':
+                    variant_labels[var] = f'CUSTOM_{position}'
                 else:
-                    variant_labels[var] = base_name
+                    variant_labels[var] = VARIANT_CHART_LABELS.get(var, var)
         else:
             variant_labels = {var: f'Wariant {var}' for var in available_variants}
         
         labels = [variant_labels[var] for var in available_variants]
         
         base_colors = ['lightblue', 'lightgreen', 'lightcoral', 'lightyellow', 'lightpink', 'lightgray']
-        bar_colors = (base_colors * ((n_variants // len(base_colors)) + 1))[:n_variants]
-        
-        fig, ((ax1, ax2), (ax3, ax4), (ax5, ax6)) = plt.subplots(3, 2, figsize=(14, 15))
+        bar_colors = list(islice(cycle(base_colors), n_variants))
+        
+        metrics = {key: [] for key in CHART_METRICS}
+        for var in available_variants:
+            data = results[var]
+            for key in CHART_METRICS:
+                metrics[key].append(data[key])
+        
+        # Figura z własnym płótnem Agg, nierejestrowana w pyplot
+        fig = Figure(figsize=(14, 15))
+        FigureCanvasAgg(fig)
+        ((ax1, ax2), (ax3, ax4), (ax5, ax6)) = fig.subplots(3, 2)
         fig.suptitle('Porównanie wariantów rozwiązania Problemu Jagodzińskiego', fontsize=16)
         
-        travel_times = [results[var]['avg_travel_time'] for var in available_variants]
-        bars1 = ax1.bar(labels, travel_times, color=bar_colors[:n_variants])
+        travel_times = metrics['avg_travel_time']
+        bars1 = ax1.bar(labels, travel_times, color=bar_colors)
         ax1.set_ylabel('Czas [s]')
         ax1.set_title('Średni czas przejazdu')
         ax1.tick_params(axis='x', rotation=45)
+        ax1.bar_label(bars1, fmt='{:.0f}s', fontsize=7, padding=2)
         
-        for bar, value in zip(bars1, travel_times):
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{value:.0f}s', ha='center', va='bottom', fontsize=2)
-        
-        speeds = [results[var]['avg_speed'] for var in available_variants]
-        bars2 = ax2.bar(labels, speeds, color=bar_colors[:n_variants])
+        speeds = metrics['avg_speed']
+        bars2 = ax2.bar(labels, speeds, color=bar_colors)
         ax2.set_ylabel('Prędkość [km/h]')
         ax2.set_title('Średnia prędkość pojazdu')
         ax2.tick_params(axis='x', rotation=45)
+        ax2.bar_label(bars2, fmt='{:.2f}', fontsize=7, padding=2)
         
-        for bar, value in zip(bars2, speeds):
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{value:.2f}', ha='center', va='bottom', fontsize=7)
-        
-        jam_lengths = [results[var]['traffic_jam_length'] for var in available_variants]
-        bars3 = ax3.bar(labels, jam_lengths, color=bar_colors[:n_variants])
+        jam_lengths = metrics['traffic_jam_length']
+        bars3 = ax3.bar(labels, jam_lengths, color=bar_colors)
         ax3.set_ylabel('Długość [km]')
         ax3.set_title('Długość korka')
         ax3.tick_params(axis='x', rotation=45)
+        ax3.bar_label(bars3, fmt='{:.3f}', fontsize=7, padding=2)
         
-        for bar, value in zip(bars3, jam_lengths):
-            height = bar.get_height()
-            ax3.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{value:.3f}', ha='center', va='bottom', fontsize=7)
-        
-        waiting_times = [results[var]['avg_waiting_time'] for var in available_variants]
-        bars4 = ax4.bar(labels, waiting_times, color=bar_colors[:n_variants])
+        waiting_times = metrics['avg_waiting_time']
+        bars4 = ax4.bar(labels, waiting_times, color=bar_colors)
         ax4.set_ylabel('Czas [s]')
         ax4.set_title('Średni czas postoju')
         ax4.tick_params(axis='x', rotation=45)
+        ax4.bar_label(bars4, fmt='{:.0f}s', fontsize=7, padding=2)
         
-        for bar, value in zip(bars4, waiting_times):
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{value:.0f}s', ha='center', va='bottom', fontsize=7)
-        
-        total_vehicles = [results[var]['total_vehicles'] for var in available_variants]
-        bars5 = ax5.bar(labels, total_vehicles, color=bar_colors[:n_variants])
+        total_vehicles = metrics['total_vehicles']
+        bars5 = ax5.bar(labels, total_vehicles, color=bar_colors)
         ax5.set_ylabel('Liczba pojazdów')
         ax5.set_title('Łączna liczba obsłużonych pojazdów')
         ax5.tick_params(axis='x', rotation=45)
+        ax5.bar_label(bars5, fmt='{:.0f}', fontsize=7, padding=2)
         
-        for bar, value in zip(bars5, total_vehicles):
-            height = bar.get_height()
-            ax5.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{value}', ha='center', va='bottom', fontsize=7)
-        
-        bus_variants = [var for var in available_variants if results[var]['bus_efficiency'] > 0]
-        if bus_variants:
-            bus_labels = [variant_labels.get(var, f'Wariant {var}') for var in bus_variants]
-            bus_efficiency = [results[var]['bus_efficiency'] for var in bus_variants]
-            bus_colors = [bar_colors[available_variants.index(var)] for var in bus_variants]
+        bus_indices = [i for i, efficiency in enumerate(metrics['bus_efficiency']) if efficiency > 0]
+        if bus_indices:
+            bus_labels = [labels[i] for i in bus_indices]
+            bus_efficiency = [metrics['bus_efficiency'][i] for i in bus_indices]
+            bus_colors = [bar_colors[i] for i in bus_indices]
             
             bars6 = ax6.bar(bus_labels, bus_efficiency, color=bus_colors)
             ax6.set_ylabel('Efektywność [%]')
             ax6.set_title('Efektywność buspasa')
             ax6.tick_params(axis='x', rotation=45)
-            
-            for bar, value in zip(bars6, bus_efficiency):
-                height = bar.get_height()
-                ax6.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                        f'{value:.1f}%', ha='center', va='bottom', fontsize=7)
+            ax6.bar_label(bars6, fmt='{:.1f}%', fontsize=7, padding=2)
         else:
-            ax6.text(0.5, 0.5, 'Brak wariantów\nz buspasem', 
-                    ha='center', va='center', transform=ax6.transAxes, 
-                    fontsize=12, style='italic')
-            ax6.set_xticks([])
-            ax6.set_yticks([])
-        
-        plt.tight_layout()
-        
-        filename = f'{os.getcwd()}/problem_jagodzinski_{filename_suffix}.png'
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
+            # Bez wariantów z buspasem panel jest usuwany, a w jego miejscu zostaje sam napis
+            panel = ax6.get_position()
+            fig.delaxes(ax6)
+            fig.text((panel.x0 + panel.x1) / 2, (panel.y0 + panel.y1) / 2, 'Brak wariantów\nz buspasem',
+                     ha='center', va='center', fontsize=12, style='italic')
+        
+        fig.tight_layout()
+        
+        basename = f'problem_jagodzinski_{filename_suffix}.{file_format}'
+        filename = f'{os.getcwd()}/{basename}'
+        if file_format == 'png':
+            fig.savefig(filename, dpi=150, pil_kwargs={'compress_level': 1})
+        else:
+            fig.savefig(filename, format=file_format)
         
-        print(f"\nWykres dla {n_variants} wariantów zapisano jako: problem_jagodzinski_{filename_suffix}.png")
+        print(f"\nWykres dla {n_variants} wariantów zapisano jako: {basename}")
         
     except ImportError:
         print("Matplotlib nie jest dostępny - pomijam tworzenie wykresów")
\ No newline at end of file
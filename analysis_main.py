@@ -5,28 +5,71 @@ Punkt wejścia do analizy danych symulacji
 """
 
 import os
-import glob
 import sys
+import io
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import analysis
-import simulation
 
 
-def main():
-    """Główna funkcja analizy"""
+def parse_args():
+    """Parsowanie argumentów linii poleceń"""
+    parser = argparse.ArgumentParser(description='Analiza danych symulacji ruchu drogowego')
+    parser.add_argument(
+        '--singlecore',
+        action='store_true',
+        help='Tworzy wykresy w głównym procesie zamiast w tle (przydatne przy debugowaniu)'
+    )
+    return parser.parse_args()
+
+
+def render_visualization(results, filename_suffix) -> tuple:
+    """
+    Tworzy wykres w osobnym procesie (matplotlib nie jest bezpieczny dla wątków)
+    
+    Returns:
+        Tuple (wydruk tworzenia wykresu, komunikat błędu lub None)
+    """
+    import simulation
+    
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            analysis.create_visualization(results, filename_suffix, simulation)
+    except Exception as e:
+        return output.getvalue(), str(e)
+    
+    return output.getvalue(), None
+
+
+def main(single_core: bool = False):
+    """
+    Główna funkcja analizy
+    
+    Args:
+        single_core: tworzy wykresy w głównym procesie zamiast w tle
+    """
+    plot_executor = None
+    plot_future = None
+    exit_code = 0
+    
     print("="*60)
     print("ANALIZA DANYCH SYMULACJI PROBLEMU JAGODZIŃSKIEGO")
     print("="*60)
     
     data_dir = "simulation_data"
-    if not os.path.exists(data_dir):
+    try:
+        with os.scandir(data_dir) as entries:
+            csv_files = [entry.path for entry in entries if entry.name.endswith('.csv') and entry.is_file()]
+    except FileNotFoundError:
         print("Brak katalogu simulation_data!")
         print("Najpierw uruchom: python3 simulation_main.py")
         return 1
     
-    csv_files = glob.glob(os.path.join(data_dir, "*.csv"))
     if not csv_files:
         print("Brak plików CSV z danymi!")
         print("Najpierw uruchom: python3 simulation_main.py")
@@ -48,6 +91,8 @@ def main():
         choice = "1"
     
     if choice == "1":
+        import simulation
+        
         print("\nPORÓWNANIE WSZYSTKICH WARIANTÓW")
         print("-" * 40)
         results = analysis.run_comparison_study(simulation)
@@ -59,6 +104,8 @@ def main():
         results = analysis.compare_bus_lane_efficiency()
         
     elif choice == "3":
+        import simulation
+        
         print("\nTEST NIESTANDARDOWEJ KONFIGURACJI")
         print("-" * 40)
         results = analysis.test_custom_configuration(
@@ -76,10 +123,17 @@ def main():
         analysis.print_all_lane_capacities_summary()
         
     elif choice == "5":
+        import simulation
+        
         print("\nCZĘŚĆ 1: PORÓWNANIE WSZYSTKICH WARIANTÓW")
         print("-" * 50)
         results1 = analysis.run_comparison_study(simulation)
-        analysis.create_visualization(results1, "wszystkie_warianty", simulation)
+        if single_core:
+            analysis.create_visualization(results1, "wszystkie_warianty", simulation)
+        else:
+            # Wykres powstaje w tle, a jego wydruk jest wypisywany dopiero po części 4
+            plot_executor = ProcessPoolExecutor(max_workers=1)
+            plot_future = plot_executor.submit(render_visualization, results1, "wszystkie_warianty")
         
         print("\nCZĘŚĆ 2: ANALIZA EFEKTYWNOŚCI BUSPASA")
         print("-" * 50)
@@ -101,15 +155,31 @@ def main():
         analysis.print_all_lane_capacities_summary()
     
     else:
+        import simulation
+        
         print("Nieprawidłowy wybór, uruchamiam porównanie wariantów...")
         results = analysis.run_comparison_study(simulation)
         analysis.create_visualization(results, "wszystkie_warianty", simulation)
     
+    if plot_future is not None:
+        try:
+            output, error = plot_future.result()
+        except Exception as e:
+            output, error = "", f"proces tworzenia wykresu zakończył się błędem ({e})"
+        finally:
+            plot_executor.shutdown()
+        
+        print(output, end="")
+        if error is not None:
+            print(f"\nNie udało się utworzyć wykresu: {error}")
+            exit_code = 1
+    
     print("\n" + "="*60)
     print("ANALIZA ZAKOŃCZONA")
     print("="*60)
-    return 0
+    return exit_code
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    args = parse_args()
+    sys.exit(main(single_core=args.singlecore))
\ No newline at end of file
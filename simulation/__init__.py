@@ -1,40 +1,45 @@
 """
 Simulation package - zawiera wszystkie klasy związane z silnikiem symulacji
+
+Podmoduły są importowane leniwie (PEP 562) przy pierwszym odwołaniu do nazwy,
+dzięki czemu np. `from simulation.constants import ...` nie ładuje silnika symulacji.
 """
 
-from .vehicle import Vehicle, VehicleType
-from .traffic_light import TrafficLight
-from .infrastructure_config import InfrastructureConfig
-from .simulation_parameters import SimulationParameters, RoadConfiguration
-from .traffic_simulation import TrafficSimulation
-from .variant_configs import (
-    get_variant_a_parameters,
-    get_variant_b_parameters, 
-    get_variant_c_parameters,
-    get_variant_d_parameters,
-    get_default_parameters,
-    get_variant_config_description,
-    get_variant_short_description,
-    create_simulation_with_parameters
-)
-from .constants import (
-    CAR_LENGTH,
-    BUS_LENGTH,
-    CAR_TOTAL_SPACE,
-    BUS_TOTAL_SPACE,
-    VEHICLE_SPACING,
-    JAM_THRESHOLD_DISTANCE,
-    DETECTION_DISTANCE,
-    BASE_VEHICLE_SPEED,
-    SLOW_TRAFFIC_THRESHOLD,
-    TRAFFIC_LIGHT_STOPPING_DISTANCE,
-    MIN_DENSITY_FACTOR,
-    DENSITY_REDUCTION_RATE,
-    SECONDS_PER_HOUR,
-    DEFAULT_SIDE_ROAD_POSITIONS,
-    BUS_EFFICIENCY_TIME_WEIGHT,
-    BUS_EFFICIENCY_SPEED_WEIGHT
-)
+import importlib
+
+_SUBMODULES = {
+    'Vehicle': 'vehicle',
+    'VehicleType': 'vehicle',
+    'TrafficLight': 'traffic_light',
+    'InfrastructureConfig': 'infrastructure_config',
+    'SimulationParameters': 'simulation_parameters',
+    'RoadConfiguration': 'simulation_parameters',
+    'TrafficSimulation': 'traffic_simulation',
+    'get_variant_a_parameters': 'variant_configs',
+    'get_variant_b_parameters': 'variant_configs',
+    'get_variant_c_parameters': 'variant_configs',
+    'get_variant_d_parameters': 'variant_configs',
+    'get_default_parameters': 'variant_configs',
+    'get_variant_config_description': 'variant_configs',
+    'get_variant_short_description': 'variant_configs',
+    'create_simulation_with_parameters': 'variant_configs',
+    'CAR_LENGTH': 'constants',
+    'BUS_LENGTH': 'constants',
+    'CAR_TOTAL_SPACE': 'constants',
+    'BUS_TOTAL_SPACE': 'constants',
+    'VEHICLE_SPACING': 'constants',
+    'JAM_THRESHOLD_DISTANCE': 'constants',
+    'DETECTION_DISTANCE': 'constants',
+    'BASE_VEHICLE_SPEED': 'constants',
+    'SLOW_TRAFFIC_THRESHOLD': 'constants',
+    'TRAFFIC_LIGHT_STOPPING_DISTANCE': 'constants',
+    'MIN_DENSITY_FACTOR': 'constants',
+    'DENSITY_REDUCTION_RATE': 'constants',
+    'SECONDS_PER_HOUR': 'constants',
+    'DEFAULT_SIDE_ROAD_POSITIONS': 'constants',
+    'BUS_EFFICIENCY_TIME_WEIGHT': 'constants',
+    'BUS_EFFICIENCY_SPEED_WEIGHT': 'constants'
+}
 
 __all__ = [
     'Vehicle', 'VehicleType',
@@ -50,4 +55,19 @@ __all__ = [
     'get_variant_config_description',
     'get_variant_short_description',
     'create_simulation_with_parameters'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Importuje podmoduł przy pierwszym odwołaniu do eksportowanej nazwy"""
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -5,7 +5,7 @@ TrafficLight class - reprezentuje sygnalizację świetlną
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class TrafficLight:
     """Klasa reprezentująca sygnalizację świetlną"""
     position: float
@@ -4,8 +4,9 @@ Main TrafficSimulation class - główna klasa symulacji ruchu drogowego
 
 import numpy as np
 import random
-import pandas as pd
 import time
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
 import os
 from datetime import datetime
 from typing import List, Dict, Optional, Any
@@ -15,8 +16,7 @@ from .traffic_light import TrafficLight
 from .infrastructure_config import InfrastructureConfig
 from .simulation_parameters import SimulationParameters, RoadConfiguration
 from .variant_configs import (
-    get_variant_a_parameters,
-    get_variant_b_parameters,
+    get_variant_parameters,
     get_default_parameters
 )
 from .constants import (
@@ -34,6 +34,31 @@ from .constants import (
 )
 
 
+# Typy pojazdów jako nazwy modułu - odczyt składowej z klasy Enum w pętlach kroku jest kosztowny
+PRIVILEGED_TYPE = VehicleType.PRIVILEGED
+REGULAR_TYPE = VehicleType.REGULAR
+
+
+def build_speed_table() -> List[float]:
+    """Zwraca prędkości dla kolejnych liczb pojazdów przed nami (0, 1, 2, ...)
+    
+    Tablica kończy się na pierwszej wartości z minimalnym współczynnikiem gęstości -
+    dla większej liczby pojazdów prędkość już się nie zmienia.
+    """
+    speeds = []
+    vehicles_ahead = 0
+    while True:
+        density_factor = max(MIN_DENSITY_FACTOR, 1.0 - vehicles_ahead * DENSITY_REDUCTION_RATE)
+        speeds.append(BASE_VEHICLE_SPEED * density_factor)
+        if density_factor == MIN_DENSITY_FACTOR or DENSITY_REDUCTION_RATE <= 0:
+            return speeds
+        vehicles_ahead += 1
+
+
+# Prędkość pojazdu zależna od liczby pojazdów przed nim (ostatnia wartość dotyczy też większych liczb)
+SPEED_BY_VEHICLES_AHEAD = build_speed_table()
+
+
 class TrafficSimulation:
     """Główna klasa symulacji ruchu drogowego"""
     
@@ -83,10 +108,8 @@ class TrafficSimulation:
                 'green_ratio': self.infrastructure_config.traffic_light_green_ratio,
                 'cycle_duration': getattr(self.infrastructure_config, 'cycle_duration', None)
             }
-        elif self.config == RoadConfiguration.VARIANT_A:
-            return get_variant_a_parameters(self.params)
-        elif self.config == RoadConfiguration.VARIANT_B:
-            return get_variant_b_parameters(self.params)
+        elif self.config is not None:
+            return get_variant_parameters(self.config.value, self.params)
         else:
             return get_default_parameters(self.params)
     
@@ -119,7 +142,7 @@ class TrafficSimulation:
     
     def get_vehicle_space(self, vehicle: Vehicle) -> float:
         """Zwraca przestrzeń zajmowaną przez pojazd na podstawie jego typu"""
-        if vehicle.vehicle_type == VehicleType.PRIVILEGED:
+        if vehicle.vehicle_type is PRIVILEGED_TYPE:
             return BUS_TOTAL_SPACE
         else:
             return CAR_TOTAL_SPACE
@@ -159,10 +182,15 @@ class TrafficSimulation:
             )
             for pos in traffic_light_positions
         ]
+        
+        # Pozycje sygnalizacji nie zmieniają się w trakcie symulacji
+        self.first_segment_end = (min(light.position for light in self.traffic_lights)
+                                  if self.traffic_lights else self.params.road_length)
     
     def generate_traffic_intensity(self):
         """Generuje natężenie ruchu zgodnie z rozkładem Poissona"""
-        mean_intensity = np.mean(self.params.traffic_intensity_range)
+        min_intensity, max_intensity = self.params.traffic_intensity_range
+        mean_intensity = (min_intensity + max_intensity) / 2
         return np.random.poisson(mean_intensity / SECONDS_PER_HOUR)
     
     def should_vehicle_turn(self) -> bool:
@@ -175,32 +203,35 @@ class TrafficSimulation:
         positions = self.params.side_road_positions or DEFAULT_SIDE_ROAD_POSITIONS
         return random.choice(positions)
     
-    def process_vehicle_queue(self, max_capacity: int):
+    def process_vehicle_queue(self, max_capacity: int, segment_spaces: Optional[Dict[int, List[float]]] = None):
         """Przetwarza kolejkę pojazdów oczekujących na wjazd"""
-        vehicles_to_remove = []
+        if segment_spaces is None:
+            segment_spaces = self.first_segment_spaces()
+        
+        entered_count = 0
         
         for vehicle in self.vehicle_queue:
-            if len(self.vehicles) < max_capacity and self.can_enter_road_segment(vehicle.lane, vehicle):
+            if len(self.vehicles) < max_capacity and self.can_enter_road_segment(vehicle.lane, vehicle, segment_spaces):
                 vehicle.entry_time = self.current_time
                 self.vehicles.append(vehicle)
+                self.add_to_segment_spaces(segment_spaces, vehicle)
                 self.record_vehicle_data(vehicle, 'entered_from_queue')
-                vehicles_to_remove.append(vehicle)
+                entered_count += 1
             else:
                 break
         
-        for vehicle in vehicles_to_remove:
-            self.vehicle_queue.remove(vehicle)
+        del self.vehicle_queue[:entered_count]
     
     def generate_vehicle(self) -> Vehicle:
         """Generuje nowy pojazd"""
-        vehicle_type = (VehicleType.PRIVILEGED 
+        vehicle_type = (PRIVILEGED_TYPE 
                        if random.random() < self.params.privileged_percentage 
-                       else VehicleType.REGULAR)
+                       else REGULAR_TYPE)
         
         will_turn = self.should_vehicle_turn()
         turn_position = self.assign_turn_position() if will_turn else None
         
-        if vehicle_type == VehicleType.PRIVILEGED and self.has_bus_lane:
+        if vehicle_type is PRIVILEGED_TYPE and self.has_bus_lane:
             bus_lane_vehicles = [v for v in self.vehicles if v.lane == -1]
             
             if len(bus_lane_vehicles) < self.bus_lane_capacity:
@@ -241,37 +272,97 @@ class TrafficSimulation:
                 light.current_phase = "green"
                 light.phase_start_time = self.current_time
     
-    def calculate_vehicle_speed(self, vehicle: Vehicle) -> float:
-        """Oblicza prędkość pojazdu na podstawie warunków ruchu"""
-        base_speed = BASE_VEHICLE_SPEED
-        
-        for light in self.traffic_lights:
-            distance_to_light = light.position - vehicle.current_position
-            if 0 < distance_to_light < TRAFFIC_LIGHT_STOPPING_DISTANCE and light.current_phase == "red":
+    def calculate_vehicle_speed(self, vehicle: Vehicle, lane_positions: Optional[List[float]] = None,
+                                red_light_positions: Optional[List[float]] = None) -> float:
+        """Oblicza prędkość pojazdu na podstawie warunków ruchu
+        
+        Args:
+            vehicle: pojazd, dla którego liczona jest prędkość
+            lane_positions: posortowane pozycje pojazdów na pasie tego pojazdu
+                (domyślnie liczone z self.vehicles)
+            red_light_positions: pozycje sygnalizatorów z czerwonym światłem
+                (domyślnie liczone z self.traffic_lights)
+        """
+        if red_light_positions is None:
+            red_light_positions = self.red_light_positions()
+        
+        for light_position in red_light_positions:
+            distance_to_light = light_position - vehicle.current_position
+            if 0 < distance_to_light < TRAFFIC_LIGHT_STOPPING_DISTANCE:
                 return 0.0
+        
+        if lane_positions is None:
+            lane_positions = sorted(v.current_position for v in self.vehicles if v.lane == vehicle.lane)
+        
+        # Pojazdy przed nami to ciągły fragment posortowanego pasa: pozycja większa od naszej
+        # i odległość mniejsza niż DETECTION_DISTANCE (odległość rośnie monotonicznie z pozycją)
+        position = vehicle.current_position
+        first_ahead = bisect_right(lane_positions, position)
+        beyond_detection = bisect_left(lane_positions, position + DETECTION_DISTANCE, lo=first_ahead)
+        
+        # Suma position + DETECTION_DISTANCE jest zaokrąglona, więc granica jest dociągana
+        # do dokładnego warunku odległości (zwykle bez żadnej iteracji)
+        while (beyond_detection > first_ahead
+               and lane_positions[beyond_detection - 1] - position >= DETECTION_DISTANCE):
+            beyond_detection -= 1
+        while (beyond_detection < len(lane_positions)
+               and lane_positions[beyond_detection] - position < DETECTION_DISTANCE):
+            beyond_detection += 1
+        
+        vehicles_ahead = beyond_detection - first_ahead
+        
+        if vehicles_ahead < len(SPEED_BY_VEHICLES_AHEAD):
+            return SPEED_BY_VEHICLES_AHEAD[vehicles_ahead]
+        return SPEED_BY_VEHICLES_AHEAD[-1]
     
-        vehicles_ahead = [other_vehicle for other_vehicle in self.vehicles 
-                         if other_vehicle.lane == vehicle.lane
-                         and other_vehicle.current_position > vehicle.current_position
-                         and other_vehicle.current_position - vehicle.current_position < DETECTION_DISTANCE
-                         and other_vehicle.id != vehicle.id]
+    def red_light_positions(self) -> List[float]:
+        """Zwraca pozycje sygnalizatorów, które w tej chwili nadają czerwone światło"""
+        return [light.position for light in self.traffic_lights if light.current_phase == "red"]
     
-        density_factor = max(MIN_DENSITY_FACTOR, 1.0 - len(vehicles_ahead) * DENSITY_REDUCTION_RATE)
+    def group_positions_by_lane(self) -> Dict[int, List[float]]:
+        """Grupuje pozycje pojazdów w ruchu w posortowane listy osobne dla każdego pasa"""
+        lane_positions = {}
+        for vehicle in self.vehicles:
+            lane_positions.setdefault(vehicle.lane, []).append(vehicle.current_position)
+        
+        for positions in lane_positions.values():
+            positions.sort()
         
-        return base_speed * density_factor
+        return lane_positions
     
-    def can_enter_road_segment(self, lane: int, new_vehicle: Vehicle = None) -> bool:
-        """Sprawdza czy pojazd może wjechać na początkowy segment drogi"""
-        if not self.traffic_lights:
-            first_segment_end = self.params.road_length
-        else:
-            first_segment_end = min(light.position for light in self.traffic_lights)
+    def first_segment_spaces(self) -> Dict[int, List[float]]:
+        """Zwraca przestrzenie zajmowane przez pojazdy na początkowym segmencie, osobno dla każdego pasa
+        
+        Wynik jest liczony raz na krok i uzupełniany przez add_to_segment_spaces
+        przy każdym wjeździe pojazdu (pozycje pojazdów nie zmieniają się do move_vehicles).
+        """
+        first_segment_end = self.first_segment_end
+        segment_spaces = {}
+        for vehicle in self.vehicles:
+            if vehicle.current_position <= first_segment_end:
+                segment_spaces.setdefault(vehicle.lane, []).append(self.get_vehicle_space(vehicle))
+        return segment_spaces
+    
+    def add_to_segment_spaces(self, segment_spaces: Dict[int, List[float]], vehicle: Vehicle):
+        """Dopisuje pojazd, który właśnie wjechał na drogę, do przestrzeni zajętych na początkowym segmencie"""
+        if vehicle.current_position <= self.first_segment_end:
+            segment_spaces.setdefault(vehicle.lane, []).append(self.get_vehicle_space(vehicle))
+    
+    def can_enter_road_segment(self, lane: int, new_vehicle: Vehicle = None,
+                               segment_spaces: Optional[Dict[int, List[float]]] = None) -> bool:
+        """Sprawdza czy pojazd może wjechać na początkowy segment drogi
+        
+        Args:
+            lane: pas, na który wjeżdża pojazd
+            new_vehicle: wjeżdżający pojazd (domyślnie samochód osobowy)
+            segment_spaces: wynik first_segment_spaces dla bieżącego kroku (domyślnie liczony od nowa)
+        """
+        first_segment_end = self.first_segment_end
         
-        vehicles_in_first_segment = [v for v in self.vehicles 
-                                   if v.lane == lane 
-                                   and v.current_position <= first_segment_end]
+        if segment_spaces is None:
+            segment_spaces = self.first_segment_spaces()
         
-        required_space = sum(self.get_vehicle_space(v) for v in vehicles_in_first_segment)
+        required_space = sum(segment_spaces.get(lane, ()))
 
         new_vehicle_space = self.get_vehicle_space(new_vehicle) if new_vehicle else CAR_TOTAL_SPACE
         
@@ -322,58 +413,66 @@ class TrafficSimulation:
     
     def move_vehicles(self):
         """Przesuwa pojazdy i aktualizuje ich stan"""
-        vehicles_to_remove = []
+        remaining_vehicles = []
+        lane_positions = self.group_positions_by_lane()
+        red_light_positions = self.red_light_positions()
+        
+        # Wartości stałe w obrębie kroku (czas kroku w godzinach zamienia km/h na km)
+        time_step = self.params.time_step
+        step_hours = time_step / SECONDS_PER_HOUR
+        road_length = self.params.road_length
         
         for vehicle in self.vehicles:
-            vehicle.speed = self.calculate_vehicle_speed(vehicle)
+            positions = lane_positions[vehicle.lane]
+            vehicle.speed = self.calculate_vehicle_speed(vehicle, positions, red_light_positions)
             
             if vehicle.speed == 0:
-                vehicle.waiting_time += self.params.time_step
+                vehicle.waiting_time += time_step
             
-            distance = vehicle.speed * (self.params.time_step / 3600)
-            vehicle.current_position += distance
+            distance = vehicle.speed * step_hours
+            if distance:
+                del positions[bisect_left(positions, vehicle.current_position)]
+                vehicle.current_position += distance
+                insort(positions, vehicle.current_position)
             
             if (vehicle.will_turn and vehicle.turn_position and 
                 vehicle.current_position >= vehicle.turn_position):
                 vehicle.travel_time = self.current_time - vehicle.entry_time
                 self.record_vehicle_data(vehicle, 'turned')
                 self.completed_vehicles.append(vehicle)
-                vehicles_to_remove.append(vehicle)
             
-            elif vehicle.current_position >= self.params.road_length:
+            elif vehicle.current_position >= road_length:
                 vehicle.travel_time = self.current_time - vehicle.entry_time
                 self.record_vehicle_data(vehicle, 'exited')
                 self.completed_vehicles.append(vehicle)
-                vehicles_to_remove.append(vehicle)
+            
+            else:
+                remaining_vehicles.append(vehicle)
         
-        for vehicle in vehicles_to_remove:
-            self.vehicles.remove(vehicle)
+        self.vehicles[:] = remaining_vehicles
     
     def calculate_traffic_jam_length(self) -> float:
         """Oblicza długość korka (pojazdy o prędkości < 10 km/h)"""
-        slow_vehicles = [v for v in self.vehicles if v.speed < SLOW_TRAFFIC_THRESHOLD]
+        slow_vehicles = sorted((v for v in self.vehicles if v.speed < SLOW_TRAFFIC_THRESHOLD),
+                               key=attrgetter('current_position'))
         if not slow_vehicles:
             return 0.0
-
-        vehicle_data = [(v.current_position, v) for v in slow_vehicles]
-        vehicle_data.sort(key=lambda x: x[0])
         
         max_jam_length = 0.0
         current_jam_length = 0.0
+        prev_position = None
         
-        for i, (position, vehicle) in enumerate(vehicle_data):
+        for vehicle in slow_vehicles:
             vehicle_space = self.get_vehicle_space(vehicle)
+            position = vehicle.current_position
             
-            if i == 0:
-                current_jam_length = vehicle_space
+            if prev_position is not None and position - prev_position < JAM_THRESHOLD_DISTANCE:
+                current_jam_length += vehicle_space
             else:
-                prev_position = vehicle_data[i-1][0]
-                gap = position - prev_position
-                if gap < JAM_THRESHOLD_DISTANCE:
-                    current_jam_length += vehicle_space
-                else:
-                    max_jam_length = max(max_jam_length, current_jam_length)
-                    current_jam_length = vehicle_space
+                max_jam_length = max(max_jam_length, current_jam_length)
+                current_jam_length = vehicle_space
+            
+            prev_position = position
         
         return max(max_jam_length, current_jam_length)
     
@@ -383,9 +482,9 @@ class TrafficSimulation:
             return 0.0
         
         bus_vehicles = [v for v in self.completed_vehicles 
-                       if v.vehicle_type == VehicleType.PRIVILEGED]
+                       if v.vehicle_type is PRIVILEGED_TYPE]
         regular_vehicles = [v for v in self.completed_vehicles 
-                          if v.vehicle_type == VehicleType.REGULAR]
+                          if v.vehicle_type is REGULAR_TYPE]
         
         if not bus_vehicles or not regular_vehicles:
             return 0.0
@@ -413,15 +512,17 @@ class TrafficSimulation:
         if self.num_lanes == 0 and self.has_bus_lane:
             max_capacity = self.bus_lane_capacity
         
-        self.process_vehicle_queue(max_capacity)
+        segment_spaces = self.first_segment_spaces()
+        self.process_vehicle_queue(max_capacity, segment_spaces)
         vehicles_to_generate = self.generate_traffic_intensity()
         for _ in range(int(vehicles_to_generate)):
             if len(self.vehicles) < max_capacity:
                 try:
                     new_vehicle = self.generate_vehicle()
                     
-                    if self.can_enter_road_segment(new_vehicle.lane, new_vehicle):
+                    if self.can_enter_road_segment(new_vehicle.lane, new_vehicle, segment_spaces):
                         self.vehicles.append(new_vehicle)
+                        self.add_to_segment_spaces(segment_spaces, new_vehicle)
                         self.record_vehicle_data(new_vehicle, 'entered')
                     else:
                         self.vehicle_queue.append(new_vehicle)
@@ -511,6 +612,8 @@ class TrafficSimulation:
 
     def save_simulation_data_to_csv(self, base_filename: str | None = None):
         """Zapisuje surowe dane symulacji do plików CSV"""
+        import pandas as pd
+        
         if base_filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_filename = f"simulation_raw_{timestamp}"
@@ -616,7 +719,9 @@ class TrafficSimulation:
         """Oblicza rzeczywiste wykorzystanie każdego pasa na podstawie danych o pojazdach"""
         if not self.simulation_data['vehicle_details']:
             return {}
-            
+        
+        import pandas as pd
+        
         vehicle_df = pd.DataFrame(self.simulation_data['vehicle_details'])
         
         entered_vehicles = vehicle_df[vehicle_df['action'].isin(['entered', 'entered_from_queue'])]
@@ -58,18 +58,23 @@ def get_default_parameters(params: SimulationParameters) -> Dict[str, Any]:
     }
 
 
+# Funkcje parametrów infrastruktury dla wariantów standardowych (klucz: litera wariantu)
+VARIANT_PARAMETER_FUNCTIONS = {
+    'A': get_variant_a_parameters,
+    'B': get_variant_b_parameters,
+    'C': get_variant_c_parameters,
+    'D': get_variant_d_parameters
+}
+
+
+def get_variant_parameters(variant_name: str, params: SimulationParameters) -> Dict[str, Any]:
+    """Zwraca parametry infrastruktury wariantu (nieznany wariant - konfiguracja domyślna)"""
+    return VARIANT_PARAMETER_FUNCTIONS.get(variant_name.upper(), get_default_parameters)(params)
+
+
 def get_variant_config_description(variant_name: str, params: SimulationParameters) -> str:
     """Zwraca opis konfiguracji dla danego wariantu"""
-    if variant_name.upper() == 'A':
-        infra_params = get_variant_a_parameters(params)
-    elif variant_name.upper() == 'B':
-        infra_params = get_variant_b_parameters(params)
-    elif variant_name.upper() == 'C':
-        infra_params = get_variant_c_parameters(params)
-    elif variant_name.upper() == 'D':
-        infra_params = get_variant_d_parameters(params)
-    else:
-        infra_params = get_default_parameters(params)
+    infra_params = get_variant_parameters(variant_name, params)
     
     description_parts = []
     
@@ -89,16 +94,7 @@ def get_variant_config_description(variant_name: str, params: SimulationParamete
 
 def get_variant_short_description(variant_name: str, params: SimulationParameters) -> str:
     """Zwraca krótki opis konfiguracji dla wykresów"""
-    if variant_name.upper() == 'A':
-        infra_params = get_variant_a_parameters(params)
-    elif variant_name.upper() == 'B':
-        infra_params = get_variant_b_parameters(params)
-    elif variant_name.upper() == 'C':
-        infra_params = get_variant_c_parameters(params)
-    elif variant_name.upper() == 'D':
-        infra_params = get_variant_d_parameters(params)
-    else:
-        infra_params = get_default_parameters(params)
+    infra_params = get_variant_parameters(variant_name, params)
     
     if infra_params['has_bus_lane']:
         return f"{infra_params['num_lanes']}P+Bus"
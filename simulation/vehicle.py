@@ -13,7 +13,7 @@ class VehicleType(Enum):
     PRIVILEGED = "privileged"
 
 
-@dataclass
+@dataclass(slots=True)
 class Vehicle:
     """Klasa reprezentująca pojedynczy pojazd"""
     id: int
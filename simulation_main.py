@@ -6,8 +6,11 @@ import numpy as np
 import random
 import sys
 import os
+import io
 import argparse
 from datetime import datetime
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -37,16 +40,48 @@ def parse_args():
         default=42,
         help='Bazowy seed dla generatora losowego (domyślnie: 42)'
     )
+    parser.add_argument(
+        '--singlecore',
+        action='store_true',
+        help='Uruchamia symulacje kolejno w jednym procesie (domyślnie: równolegle)'
+    )
     return parser.parse_args()
 
 
-def main(reruns: int = None, base_seed: int = 42):
+def run_simulation_task(task: tuple) -> tuple:
+    """
+    Uruchamia pojedynczą symulację z własnym seedem (funkcja procesu roboczego)
+    
+    Args:
+        task: (parametry symulacji, parametry infrastruktury, nazwa pliku, seed)
+    
+    Returns:
+        Tuple (wydruk symulacji, komunikat błędu lub None)
+    """
+    sim_params, infra_params, filename, run_seed = task
+    
+    np.random.seed(run_seed)
+    random.seed(run_seed)
+    
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            sim = create_simulation_with_parameters(sim_params, infra_params)
+            sim.run_simulation(save_data=True, data_filename=filename)
+    except Exception as e:
+        return output.getvalue(), str(e)
+    
+    return output.getvalue(), None
+
+
+def main(reruns: int = None, base_seed: int = 42, single_core: bool = False):
     """
     Główna funkcja programu
     
     Args:
         reruns: Liczba powtórzeń dla każdego scenariusza (None = pytaj interaktywnie)
         base_seed: Bazowy seed dla generatora losowego
+        single_core: uruchamia symulacje kolejno zamiast w puli procesów
     """
     np.random.seed(base_seed)
     random.seed(base_seed)
@@ -196,7 +231,8 @@ def main(reruns: int = None, base_seed: int = 42):
     print(f"URUCHAMIANIE {len(scenarios_to_run)} SCENARIUSZY × {reruns} POWTÓRZEŃ = {total_runs} SYMULACJI")
     print("="*60)
     
-    run_counter = 0
+    runs = []
+    tasks = []
     for i, scenario in enumerate(scenarios_to_run, 1):
         if len(scenario) == 5:
             variant_id, description, config, infra_params, filename_base = scenario
@@ -204,31 +240,44 @@ def main(reruns: int = None, base_seed: int = 42):
         else:
             variant_id, description, config, infra_params, filename_base, sim_params = scenario
         
-        print(f"\nScenariusz {i}/{len(scenarios_to_run)}: {description}")
-        
         for run_num in range(1, reruns + 1):
-            run_counter += 1
             run_seed = base_seed + run_num - 1
             
-            np.random.seed(run_seed)
-            random.seed(run_seed)
-            
             if reruns > 1:
                 filename = f"{filename_base}_run{run_num:02d}"
             else:
                 filename = filename_base
             
-            try:
-                sim = create_simulation_with_parameters(sim_params, infra_params)
-                result = sim.run_simulation(save_data=True, data_filename=filename)
-                
-                if reruns > 1:
-                    print(f"   [{run_counter}/{total_runs}] Powtórzenie {run_num}/{reruns} (seed={run_seed}) → '{filename}'")
-                else:
-                    print(f"   [{run_counter}/{total_runs}] Ukończono → '{filename}'")
-                
-            except Exception as e:
-                print(f"   [{run_counter}/{total_runs}] Błąd w powtórzeniu {run_num}: {e}")
+            runs.append((i, description, run_num, run_seed, filename))
+            tasks.append((sim_params, infra_params, filename, run_seed))
+    
+    # Każde uruchomienie ma własny seed, więc symulacje są niezależne i mogą działać równolegle;
+    # wydruki są zbierane w procesach roboczych i wypisywane w kolejności uruchomień
+    if single_core or len(tasks) < 2:
+        executor = None
+        outcomes = map(run_simulation_task, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1))
+        outcomes = executor.map(run_simulation_task, tasks)
+    
+    try:
+        current_scenario = None
+        for run_counter, ((i, description, run_num, run_seed, filename), (output, error)) in enumerate(zip(runs, outcomes), 1):
+            if i != current_scenario:
+                current_scenario = i
+                print(f"\nScenariusz {i}/{len(scenarios_to_run)}: {description}")
+            
+            print(output, end="")
+            
+            if error is not None:
+                print(f"   [{run_counter}/{total_runs}] Błąd w powtórzeniu {run_num}: {error}")
+            elif reruns > 1:
+                print(f"   [{run_counter}/{total_runs}] Powtórzenie {run_num}/{reruns} (seed={run_seed}) → '{filename}'")
+            else:
+                print(f"   [{run_counter}/{total_runs}] Ukończono → '{filename}'")
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
     print(f"\nWszystkie symulacje zakończone ({total_runs} uruchomień)")
     print(f"Dane zapisane w katalogu: simulation_data/")
@@ -241,4 +290,4 @@ def main(reruns: int = None, base_seed: int = 42):
 
 if __name__ == "__main__":
     args = parse_args()
-    main(reruns=args.reruns, base_seed=args.seed)
\ No newline at end of file
+    main(reruns=args.reruns, base_seed=args.seed, single_core=args.singlecore)
\ No newline at end of file
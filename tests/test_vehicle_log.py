@@ -0,0 +1,108 @@
+"""
+Testy wczytywania plików *_vehicles.csv
+"""
+
+import csv
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.data_loader import (
+    calculate_statistics_from_log_summary,
+    calculate_statistics_from_raw_data,
+    read_vehicle_log,
+    read_vehicle_log_summary
+)
+
+
+VEHICLE_LOG_HEADER = (
+    'vehicle_id', 'timestamp', 'action', 'vehicle_type', 'lane', 'position', 'speed',
+    'travel_time', 'waiting_time', 'will_turn', 'turn_position'
+)
+
+TEST_CONFIG = {'road_length': 1.0, 'has_bus_lane': True}
+
+
+def write_vehicle_log(path: str, num_vehicles: int = 300, seed: int = 7) -> None:
+    """Zapisuje losowy (powtarzalny) plik pojazdów w formacie zapisywanym przez symulację"""
+    rng = random.Random(seed)
+    events = []
+    
+    for vehicle_id in range(1, num_vehicles + 1):
+        vehicle_type = 'privileged' if rng.random() < 0.2 else 'regular'
+        lane = 'bus' if vehicle_type == 'privileged' else rng.randint(0, 2)
+        will_turn = rng.random() < 0.15
+        turn_position = round(rng.uniform(0.2, 0.8), 2) if will_turn else ''
+        start = float(rng.randint(0, 600))
+        waiting_time = 0.0
+        action = 'entered'
+        
+        if rng.random() < 0.3:
+            events.append((start, vehicle_id, 'queued', vehicle_type, lane, 0.0, 0.0, 0.0, 0.0, will_turn, turn_position))
+            waiting_time = float(rng.randint(1, 60))
+            start += waiting_time
+            action = 'entered_from_queue'
+        
+        if rng.random() < 0.1:
+            # Pojazd wciąż w kolejce na końcu symulacji
+            continue
+        
+        position = round(rng.uniform(0.0, 1.0), 3)
+        speed = round(rng.uniform(0.0, 50.0), 1)
+        events.append((start, vehicle_id, action, vehicle_type, lane, position, speed, 0.0, waiting_time, will_turn, turn_position))
+        
+        if rng.random() < 0.6:
+            travel_time = float(rng.randint(0, 400))
+            end_action = 'turned' if will_turn else 'exited'
+            end_position = turn_position if will_turn else 1.0
+            events.append((start + travel_time, vehicle_id, end_action, vehicle_type, lane, end_position,
+                           round(rng.uniform(5.0, 50.0), 1), travel_time, waiting_time, will_turn, turn_position))
+    
+    events.sort(key=lambda event: (event[0], event[1]))
+    with open(path, 'w', newline='') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(VEHICLE_LOG_HEADER)
+        for timestamp, vehicle_id, *rest in events:
+            writer.writerow((vehicle_id, timestamp, *rest))
+
+
+class VehicleLogTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.vehicle_file = tempfile.mkstemp(suffix='_vehicles.csv')
+        os.close(fd)
+        self.addCleanup(os.unlink, self.vehicle_file)
+        write_vehicle_log(self.vehicle_file)
+    
+    def assertStatisticsEqual(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            self.assertTrue(np.isclose(actual[key], value, rtol=0, atol=1e-9), f"{key}: {actual[key]} != {value}")
+    
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow nie jest zainstalowany')
+    def test_pyarrow_engine_matches_c_engine(self):
+        c_stats = calculate_statistics_from_raw_data(read_vehicle_log(self.vehicle_file, engine='c'), TEST_CONFIG)
+        pyarrow_stats = calculate_statistics_from_raw_data(
+            read_vehicle_log(self.vehicle_file, engine='pyarrow'), TEST_CONFIG
+        )
+        
+        self.assertStatisticsEqual(pyarrow_stats, c_stats)
+    
+    def test_chunked_summary_matches_whole_file(self):
+        expected = calculate_statistics_from_raw_data(read_vehicle_log(self.vehicle_file), TEST_CONFIG)
+        
+        # Małe fragmenty: kategorie różnią się między fragmentami, a wpisy pojazdów są rozdzielone
+        for chunksize in (7, 97):
+            with self.subTest(chunksize=chunksize):
+                summary = read_vehicle_log_summary(self.vehicle_file, chunksize=chunksize)
+                self.assertStatisticsEqual(calculate_statistics_from_log_summary(*summary, TEST_CONFIG), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()